@@ -3,6 +3,8 @@ import streamlit as st
 from halaman.hal_home import render_home_page
 from halaman.hal_dataset import render_dataset_page
 from halaman.hal_clustering import render_clustering_page
+from halaman.hal_admin import render_admin_page
+from utils.memori import daftarkan_sesi, admin_dari_env
 
 # --- CONFIG PAGE ---
 st.set_page_config(
@@ -12,18 +14,25 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
+# Dicatat untuk halaman Admin (ukuran session_state semua sesi aktif)
+daftarkan_sesi()
+
 # --- SESSION DEFAULT ---
 if "selected_page_index" not in st.session_state:
     st.session_state["selected_page_index"] = 0
 
 # --- MENU LIST ---
 menu_list = ["Home", "Dataset", "Clustering"]
+menu_icons = ["house", "database", "gear"]
+if admin_dari_env():
+    menu_list.append("Admin")
+    menu_icons.append("speedometer")
 
 # --- OPTION MENU ---
 selected = option_menu(
     menu_title=None,
     options=menu_list,
-    icons=["house", "database", "gear"],
+    icons=menu_icons,
     orientation="horizontal",
     styles={
         "container": {"padding": "0!important", "background-color": "#192734"},
@@ -54,6 +63,8 @@ elif page_index == 1:
     render_dataset_page()
 elif page_index == 2:
     render_clustering_page()
+elif page_index == 3 and admin_dari_env():
+    render_admin_page()
     
 
 
@@ -0,0 +1,101 @@
+import os
+import tracemalloc
+
+import pandas as pd
+import streamlit as st
+
+from modules.atlas import atlas_file, atlas_usang
+from modules.data_processing import daftar_sheet
+from utils.memori import ukuran_sesi
+
+
+def _format_mb(nbyte):
+    return f"{nbyte / 1024 ** 2:.1f} MB"
+
+
+def _rss_proses():
+    """Resident set size proses Streamlit (Linux), atau None jika tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _status_atlas(path="DATASET.xlsx"):
+    """Status atlas tiap sheet: belum dibangun, sesuai, atau usang (mis. setelah alias wilayah disimpan)."""
+    baris = []
+    for sheet in daftar_sheet(path):
+        if not os.path.exists(atlas_file(sheet)):
+            status = "belum dibangun"
+        else:
+            status = "usang" if atlas_usang(path, sheet) else "sesuai"
+        baris.append({'Sheet': sheet, 'Atlas': status})
+    return pd.DataFrame(baris, columns=['Sheet', 'Atlas'])
+
+
+def render_admin_page():
+    """Ukuran session_state per key di semua sesi aktif, untuk sizing instance dan memilih key yang perlu dibuang."""
+    st.title("Memori Sesi")
+    st.caption(
+        "Perkiraan byte yang ditahan tiap key session_state di semua sesi aktif pada proses ini. "
+        "Objek yang dipakai bersama (mis. atlas) terhitung di tiap key yang memakainya; "
+        "'Total unik' menghitungnya sekali."
+    )
+
+    if st.button("🔄 Hitung Ulang", use_container_width=True):
+        st.rerun()
+
+    with st.spinner("Mengukur session_state..."):
+        tabel, total_unik = ukuran_sesi()
+
+    rss = _rss_proses()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Sesi aktif", tabel['Sesi'].nunique())
+    col2.metric("Total unik", _format_mb(total_unik))
+    col3.metric("RSS proses", _format_mb(rss) if rss is not None else "N/A")
+    col4.metric("tracemalloc", "aktif" if tracemalloc.is_tracing() else "nonaktif")
+
+    st.subheader("Atlas")
+    status = _status_atlas()
+    usang = status.loc[status['Atlas'] == "usang", 'Sheet'].tolist()
+    if usang:
+        st.warning(
+            "Atlas usang untuk: " + ", ".join(usang) + ". Mode optimal dihitung langsung sampai atlas dibangun ulang "
+            "dengan `python -m modules.atlas`."
+        )
+    st.dataframe(status, hide_index=True, use_container_width=True)
+
+    if tabel.empty:
+        st.info("Belum ada sesi yang terdaftar.")
+        return
+
+    tabel = tabel.assign(MB=tabel['Byte'] / 1024 ** 2)
+
+    st.subheader("Per key (semua sesi)")
+    per_key = (
+        tabel.groupby('Key', as_index=False)
+        .agg(Sesi=('Sesi', 'nunique'), MB=('MB', 'sum'), Maks_MB=('MB', 'max'))
+        .sort_values('MB', ascending=False)
+    )
+    st.dataframe(
+        per_key,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'MB': st.column_config.ProgressColumn("Total (MB)", format="%.2f", min_value=0, max_value=float(per_key['MB'].max()) or 1.0),
+            'Maks_MB': st.column_config.NumberColumn("Maks per sesi (MB)", format="%.2f"),
+        },
+    )
+
+    st.subheader("Per sesi")
+    per_sesi = tabel.groupby('Sesi', as_index=False)['MB'].sum().sort_values('MB', ascending=False)
+    st.dataframe(per_sesi, hide_index=True, use_container_width=True, column_config={'MB': st.column_config.NumberColumn(format="%.2f")})
+
+    with st.expander("Rincian sesi x key"):
+        st.dataframe(
+            tabel.drop(columns='Byte'),
+            hide_index=True,
+            use_container_width=True,
+            column_config={'MB': st.column_config.NumberColumn(format="%.3f")},
+        )
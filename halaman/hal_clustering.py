@@ -1,20 +1,114 @@
 import streamlit as st
 from modules.konten import penjelasan_tpt, penjelasan_tpak
-from utils.session import opsi_tahun
+from utils.session import get_opsi_tahun
 from streamlit_folium import st_folium
 import time
 import pandas as pd
 import numpy as np
 
-from modules.analysis import run_analysis
+from modules.analysis import run_analysis, muat_dari_atlas, perbarui_eps_dbscan, kunci_dbscan_live, saran_alias, simpan_saran_alias
+from modules.data_processing import daftar_sheet
+from modules.atlas import atlas_usang
 from modules.plot import (
     render_kmeans_helpers,
+    render_kmeans_centroids,
     render_metrics_and_silhouette,
     render_boxplot,
     render_scatter_plots,
     render_dbscan_helpers,
+    render_dbscan_sensitivity,
 )
 from utils.saveaspdf import generate_pdf_report
+from utils.profiler import profil, profil_dari_env, simpan_profil, tampilkan_ringkasan
+from utils.memori import ukur_memori, memori_dari_env, admin_dari_env
+
+
+def _profil_aktif():
+    """Profiling aktif lewat toggle Debug di sidebar atau environment variable CLUSTERING_PROFILE."""
+    return st.session_state.get("profil_aktif", False) or profil_dari_env()
+
+
+def _memori_aktif():
+    """Pengukuran memori aktif lewat toggle Debug di sidebar atau environment variable CLUSTERING_MEMORY."""
+    return st.session_state.get("memori_aktif", False) or memori_dari_env()
+
+
+def render_debug_sidebar():
+    """Toggle profiling & pengukuran memori dan unduhan profil terakhir (run_analysis / laporan PDF) di sidebar."""
+    with st.sidebar.expander("🛠️ Debug"):
+        st.checkbox(
+            "Profiling (cProfile)",
+            key="profil_aktif",
+            value=st.session_state.get("profil_aktif", False) or profil_dari_env(),
+            disabled=profil_dari_env(),
+            help="Merekam profil fungsi saat menjalankan clustering dan membuat laporan PDF. "
+                 "Nonaktif tidak menambah beban apa pun. Bisa juga diaktifkan dengan CLUSTERING_PROFILE=1.",
+        )
+        st.checkbox(
+            "Ukur memori (tracemalloc)",
+            key="memori_aktif",
+            value=st.session_state.get("memori_aktif", False) or memori_dari_env(),
+            disabled=memori_dari_env(),
+            help="Mencatat puncak dan sisa memori tiap tahap clustering (lihat 'Rincian memori per tahap'). "
+                 "Memperlambat run; bisa juga diaktifkan dengan CLUSTERING_MEMORY=1.",
+        )
+        hasil = st.session_state.get("profil_terakhir")
+        if hasil is not None:
+            tampilkan_ringkasan(st, hasil)
+            st.download_button(
+                "💾 Unduh Profil (.prof)",
+                data=hasil["data"],
+                file_name=hasil["file_name"],
+                mime="application/octet-stream",
+                use_container_width=True,
+                help="Buka dengan `python -m pstats <file>` atau `snakeviz <file>`.",
+            )
+
+
+def render_saran_alias(path, sheet):
+    """
+    Saran nama peta untuk wilayah data yang tidak cocok dengan GeoJSON; saran yang diterima disimpan sebagai alias.
+    Tabel alias dipakai semua sesi dan mengubah kunci atlas, jadi hanya tersedia jika CLUSTERING_ADMIN=1
+    (atau lewat python -m modules.alias --terima).
+    """
+    if not admin_dari_env():
+        return
+    if atlas_usang(path, sheet):
+        st.warning(
+            f"Atlas sheet '{sheet}' tidak sesuai lagi dengan tabel alias/dataset, sehingga mode optimal dihitung "
+            f"langsung untuk setiap pengunjung. Bangun ulang: `python -m modules.atlas --sheet \"{sheet}\"`."
+        )
+    saran = saran_alias()
+    if saran is None or saran.empty:
+        return
+    with st.expander(f"⚠️ {saran['nama_data'].nunique()} wilayah data tidak ada di peta"):
+        st.caption(
+            "Nama wilayah di data tidak sama persis dengan GeoJSON (ejaan, awalan Kabupaten/Kota, pemekaran). "
+            "Centang saran yang benar lalu simpan; alias dipakai untuk semua run berikutnya dan atlas perlu dibangun ulang."
+        )
+        tabel = saran.assign(Terima=False)[['Terima', 'nama_data', 'prov', 'nama_peta', 'prov_peta', 'skor', 'peringkat']]
+        hasil_edit = st.data_editor(
+            tabel,
+            hide_index=True,
+            use_container_width=True,
+            disabled=[c for c in tabel.columns if c != 'Terima'],
+            column_config={
+                'nama_data': "Nama di Data",
+                'prov': "Provinsi",
+                'nama_peta': "Saran Nama di Peta",
+                'prov_peta': "Provinsi Peta",
+                'skor': st.column_config.ProgressColumn("Kemiripan", format="%.2f", min_value=0, max_value=1),
+                'peringkat': "Peringkat",
+            },
+            key="editor_saran_alias",
+        )
+        if st.button("💾 Simpan Alias", use_container_width=True):
+            terima = hasil_edit[hasil_edit['Terima']].sort_values('peringkat').drop_duplicates(['prov', 'nama_data'])
+            if terima.empty:
+                st.warning("Belum ada saran yang dicentang.")
+            else:
+                simpan_saran_alias(terima)
+                st.rerun()
 
 
 def render_clustering_page():
@@ -35,10 +129,41 @@ def render_clustering_page():
         "Sistem Pemetaan Wilayah Berdasarkan Tingkat Pengangguran Terbuka dan Tingkat Partisipasi Angkatan Kerja di Indonesia dengan K-Means dan DBSCAN"
     )
     path = "DATASET.xlsx"
-    sheet = "Populasi"
 
     col1, col2 = st.columns([0.5, 0.5])
     with col1:
+        # * Dataset (sheet)
+        st.subheader("PILIH DATASET")
+        try:
+            # Semua sheet dimuat paralel sekali, pindah sheet langsung dari memori
+            opsi_sheet = daftar_sheet(path)
+        except FileNotFoundError:
+            st.error(f"File '{path}' tidak ditemukan.")
+            return
+        sheet = st.selectbox(
+            "Pilih Sheet",
+            opsi_sheet,
+            key="sheet_pilihan",
+            index=opsi_sheet.index(st.session_state.get("sheet_pilihan", opsi_sheet[0]))
+            if st.session_state.get("sheet_pilihan") in opsi_sheet else 0,
+            label_visibility="collapsed",
+            help="Populasi: seluruh kabupaten/kota. Sampel: sebagian wilayah untuk perbandingan.",
+        )
+
+        opsi_tahun = get_opsi_tahun(path, sheet)
+        if not opsi_tahun:
+            st.error("Tidak ada kolom TPT_YYYY/TPAK_YYYY pada sheet ini.")
+            return
+
+        # Reset pilihan tahun jika tidak tersedia di sheet yang dipilih
+        tp_before = st.session_state.get("tahun_pilihan")
+        if isinstance(tp_before, str):
+            tp_before = (tp_before,)
+        if tp_before is not None and any(str(t) not in opsi_tahun for t in tp_before):
+            st.session_state["tahun_pilihan"] = (opsi_tahun[0], opsi_tahun[-1])
+
+        st.divider()
+
         # * Variabel & Tahun
         st.subheader("PILIH VARIABEL & TAHUN")
 
@@ -153,6 +278,18 @@ def render_clustering_page():
             )
             params["k"] = k_value
             params["optimal_k"] = optimal_k
+
+            if optimal_k:
+                st.markdown("Rentang K yang diuji (dijalankan paralel)")
+                k_range = st.slider(
+                    "Rentang K",
+                    2,
+                    15,
+                    key="k_range",
+                    value=st.session_state.get("k_range", (2, 6)),
+                    label_visibility="collapsed",
+                )
+                params["k_range"] = tuple(k_range)
             
         elif metode == "DBSCAN":
             optimal_dbscan = st.checkbox(
@@ -202,10 +339,30 @@ def render_clustering_page():
                 """
             )
             
+            live_eps = st.checkbox(
+                "Eksplorasi Epsilon langsung",
+                key="live_eps",
+                value=st.session_state.get("live_eps", False),
+                disabled=optimal_dbscan,
+                help="""
+                Setelah clustering dijalankan sekali, perubahan slider Epsilon langsung
+                memperbarui cluster, skor dan peta tanpa menjalankan ulang seluruh proses.
+                Mengubah MinPts, PCA, variabel atau tahun tetap memerlukan "Jalankan Clustering".
+                """
+            )
+
             params["eps"] = eps_value
             params["minpts"] = minpts_value
             params["optimal_dbscan"] = optimal_dbscan
             params["use_pca_manual"] = use_pca_manual
+            params["live_eps"] = live_eps and not optimal_dbscan
+
+            params["sensitivitas_dbscan"] = st.checkbox(
+                "Hitung sensitivitas Epsilon × MinPts",
+                key="sensitivitas_dbscan",
+                value=st.session_state.get("sensitivitas_dbscan", False),
+                help="Menampilkan heatmap Silhouette, jumlah cluster dan rasio noise untuk grid 50 nilai Epsilon × MinPts 2–20."
+            )
 
         st.divider()
         run_button = st.button(
@@ -219,7 +376,8 @@ def render_clustering_page():
             else:
                 logger = st.sidebar.status("Memulai proses clustering...", expanded=True)
                 with st.spinner("Memproses data dan membuat peta..."):
-                    run_analysis(
+                    # Mode optimal dilayani dari atlas; parameter manual dihitung langsung
+                    args = (
                         var,
                         st.session_state["tahun_pilihan"],
                         st.session_state["metode_pilihan"],
@@ -228,8 +386,24 @@ def render_clustering_page():
                         sheet,
                         logger
                     )
+                    with ukur_memori(_memori_aktif()) as pelacak, profil(_profil_aktif()) as profiler:
+                        if not muat_dari_atlas(*args):
+                            run_analysis(*args)
+                    if pelacak is not None and st.session_state.get("scores"):
+                        st.session_state["scores"]["memori"] = pelacak.tahapan
+                    if profiler is not None:
+                        tampilkan_ringkasan(logger, simpan_profil(st.session_state, "run_analysis", profiler))
                     
                     logger.update(label="Proses Selesai!", state="complete", expanded=True)
+        elif metode == "DBSCAN" and params.get("live_eps"):
+            # Ekstraksi ulang DBSCAN untuk Epsilon baru dari hasil terakhir (split & MinPts sama)
+            live = st.session_state.get("dbscan_live")
+            if (
+                live is not None
+                and live["kunci"] == kunci_dbscan_live(sheet, var, st.session_state["tahun_pilihan"], minpts_value, use_pca_manual)
+                and (st.session_state.get("params") or {}).get("eps") != eps_value
+            ):
+                perbarui_eps_dbscan(eps_value)
 
     # BAGIAN 3 - OUTPUT HASIL
     with col2:  # Metrik & Silhouette
@@ -238,6 +412,8 @@ def render_clustering_page():
             st.session_state.get("scores"),
             st.session_state.get("hasil_data"),
             st.session_state.get("data_for_clustering"),
+            st.session_state.get("distance_cache"),
+            st.session_state.get("silhouette_samples"),
         )
 
     metode_terpilih = st.session_state.get("metode_pilihan", "K-Means")
@@ -248,14 +424,22 @@ def render_clustering_page():
             st.session_state.get("dbscan_minpts_plot_data"),
             st.session_state.get("dbscan_elbow_knee")
         )
+        render_dbscan_sensitivity(
+            st.session_state.get("dbscan_sensitivity_data"),
+            (st.session_state.get("params") or {}).get("eps"),
+            (st.session_state.get("params") or {}).get("minpts"),
+        )
         st.divider()
         
     elif metode_terpilih == "K-Means":
         render_kmeans_helpers(
             st.session_state.get("kmeans_k_search_data")
         )
+        render_kmeans_centroids(
+            st.session_state.get("kmeans_centroids")
+        )
         # Tambahkan divider hanya jika tabelnya benar-benar ditampilkan
-        if st.session_state.get("kmeans_k_search_data") is not None:
+        if st.session_state.get("kmeans_k_search_data") is not None or st.session_state.get("kmeans_centroids") is not None:
             st.divider()
     st.subheader("JUMLAH WILAYAH PER CLUSTER", help="Tabel ini menunjukkan jumlah wilayah yang termasuk dalam setiap cluster hasil clustering.")
     if st.session_state.get("hasil_data") is not None:
@@ -295,6 +479,7 @@ def render_clustering_page():
             except Exception as e:
                 st.error(f"Gagal menampilkan peta: {e}")
                 st.container(height=600)
+        render_saran_alias(path, sheet)
     else:
         st.container(height=600)
 
@@ -363,7 +548,10 @@ def render_clustering_page():
                     )
 
                     with st.spinner("Menyusun laporan PDF..."):
-                        pdf_bytes = generate_pdf_report()
+                        with profil(_profil_aktif()) as profiler:
+                            pdf_bytes = generate_pdf_report()
+                        if profiler is not None:
+                            simpan_profil(st.session_state, "generate_pdf_report", profiler)
 
 
                         if pdf_bytes:
@@ -397,7 +585,12 @@ def render_clustering_page():
                     "dbscan_elbow_minpts",
                     "dbscan_minpts_plot_data",
                     "dbscan_elbow_knee",
-                    "kmeans_k_search_data"
+                    "dbscan_sensitivity_data",
+                    "kmeans_k_search_data",
+                    "kmeans_centroids",
+                    "distance_cache",
+                    "dbscan_live",
+                    "silhouette_samples"
                 ]
                 for key in keys_to_clear:
                     if key in st.session_state:
@@ -406,4 +599,5 @@ def render_clustering_page():
                 st.success("Hasil analisis saat ini telah dihapus.")
                 st.rerun()
     else:
-        st.info("Belum ada hasil clustering...")
\ No newline at end of file
+        st.info("Belum ada hasil clustering...")
+    render_debug_sidebar()
@@ -1,27 +1,103 @@
 import streamlit as st
 import pandas as pd
-from modules.data_processing import muat_data, replace_non_numeric
+import numpy as np
+from modules.data_processing import muat_data_tampilan, daftar_sheet, POLA_KOLOM_TAHUN, KOLOM_IDENTITAS
 from modules.konten import penjelasan_dataset
 
+UKURAN_HALAMAN = [25, 50, 100, 250]
+
+def ambil_halaman(df, prov=None, kolom=None, sort_by=None, ascending=True, page=1, page_size=50):
+    """
+    Filter provinsi, pilih kolom, urutkan, lalu potong satu halaman secara vektor.
+    Hanya baris pada halaman yang dibentuk menjadi DataFrame baru.
+    Mengembalikan (df_halaman, jumlah_baris_setelah_filter).
+    """
+    posisi = np.arange(len(df))
+    if prov:
+        posisi = posisi[df['prov'].isin(prov).to_numpy()]
+
+    if sort_by is not None and sort_by in df.columns:
+        nilai = df[sort_by].to_numpy()[posisi]
+        if pd.api.types.is_numeric_dtype(df[sort_by]):
+            # NaN selalu di akhir, baik urut naik maupun turun
+            kunci = np.where(np.isnan(nilai), np.inf, nilai if ascending else -nilai)
+        else:
+            kunci = pd.Series(nilai).astype(str).str.upper().to_numpy()
+        urutan = np.argsort(kunci, kind='stable')
+        if not ascending and not pd.api.types.is_numeric_dtype(df[sort_by]):
+            urutan = urutan[::-1]
+        posisi = posisi[urutan]
+
+    total = len(posisi)
+    start = (max(page, 1) - 1) * page_size
+    df_halaman = df.iloc[posisi[start:start + page_size]]
+    if kolom is not None:
+        df_halaman = df_halaman[kolom]
+    return df_halaman, total
+
 def render_dataset_page():
     with st.spinner("Memuat dataset..."):
       st.title("TAMPILAN DATASET ASLI")
       st.markdown("Dataset bersumber dari BPS (Badan Pusat Statistik) per provinsi.")
 
       path = "DATASET.xlsx"
-      sheet = "Populasi"
       
       try:
-          # 1. Muat data
-          df_raw = muat_data(path, sheet)
+          # Pilih sheet (semua sheet sudah dimuat paralel di memori)
+          opsi_sheet = daftar_sheet(path)
+          sheet = st.selectbox("Pilih Sheet", opsi_sheet, key="sheet_dataset")
+
+          # 1. Muat data (tabel disimpan di server, hanya satu halaman yang dikirim ke browser)
+          df_tampil, n_imputasi = muat_data_tampilan(path, sheet)
 
-          if df_raw.empty:
+          if df_tampil.empty:
             # Debug error muat data
             st.error("Gagal memuat data atau data kosong.")
           else:
-            df_display = replace_non_numeric(df_raw)
-            st.dataframe(df_display, use_container_width=True)
-            st.caption(f"Total {df_display.shape[0]} baris dan {df_display.shape[1]} kolom.")
+            # 2. Filter provinsi & pilih kolom (indikator/tahun)
+            kolom_tahun = [c for c in df_tampil.columns if POLA_KOLOM_TAHUN.match(str(c))]
+            opsi_indikator = sorted({c.split('_')[0] for c in kolom_tahun})
+            opsi_tahun = sorted({c.split('_')[1] for c in kolom_tahun})
+            opsi_prov = sorted(df_tampil['prov'].dropna().astype(str).unique()) if 'prov' in df_tampil.columns else []
+
+            col_f1, col_f2, col_f3 = st.columns(3)
+            prov = col_f1.multiselect("Filter Provinsi", opsi_prov, key="dataset_prov", placeholder="Semua provinsi")
+            indikator = col_f2.multiselect("Indikator", opsi_indikator, default=opsi_indikator, key="dataset_indikator")
+            tahun = col_f3.multiselect("Tahun", opsi_tahun, default=opsi_tahun, key="dataset_tahun")
+
+            kolom = [c for c in df_tampil.columns if c in KOLOM_IDENTITAS or not POLA_KOLOM_TAHUN.match(str(c))]
+            kolom += [c for c in kolom_tahun if c.split('_')[0] in indikator and c.split('_')[1] in tahun]
+
+            # 3. Urutan & halaman
+            col_s1, col_s2, col_s3, col_s4 = st.columns([0.35, 0.25, 0.2, 0.2])
+            sort_by = col_s1.selectbox("Urutkan berdasarkan", ["(urutan asli)"] + kolom, key="dataset_sort")
+            urutan = col_s2.radio("Urutan", ["Naik", "Turun"], horizontal=True, key="dataset_urutan")
+            page_size = col_s3.selectbox("Baris per halaman", UKURAN_HALAMAN, index=1, key="dataset_page_size")
+
+            n_filter = int(df_tampil['prov'].isin(prov).sum()) if prov else len(df_tampil)
+            n_halaman = max(1, -(-n_filter // page_size))
+            page = col_s4.number_input("Halaman", min_value=1, max_value=n_halaman, value=1, step=1, key="dataset_page")
+
+            df_halaman, total = ambil_halaman(
+                df_tampil,
+                prov=prov,
+                kolom=kolom,
+                sort_by=None if sort_by == "(urutan asli)" else sort_by,
+                ascending=(urutan == "Naik"),
+                page=int(page),
+                page_size=page_size,
+            )
+            st.dataframe(df_halaman, use_container_width=True)
+
+            start = (int(page) - 1) * page_size
+            st.caption(
+                f"Menampilkan baris {min(start + 1, total)}–{min(start + page_size, total)} dari {total} "
+                f"(halaman {int(page)}/{n_halaman}). Total {df_tampil.shape[0]} baris dan {df_tampil.shape[1]} kolom."
+            )
+
+            # Ringkasan imputasi missing value yang dilakukan saat preprocessing
+            if n_imputasi.sum() > 0:
+              st.caption(f"{int(n_imputasi.sum())} sel kosong akan diisi (imputasi) saat preprocessing pada {int((n_imputasi > 0).sum())} wilayah.")
 
       except FileNotFoundError:
         # Debug path file tidak ditemukan
@@ -31,4 +107,4 @@ def render_dataset_page():
         st.error(f"Terjadi kesalahan saat memuat atau menampilkan data: {e}")
         
       with st.expander("Penjelasan Kolom Dataset"):
-          st.markdown(penjelasan_dataset, unsafe_allow_html=True)
\ No newline at end of file
+          st.markdown(penjelasan_dataset, unsafe_allow_html=True)
@@ -0,0 +1,187 @@
+"""
+Saran dan tabel alias untuk nama wilayah data yang tidak cocok persis dengan GeoJSON.
+
+Contoh:
+    python -m modules.alias --sheet Sampel
+    python -m modules.alias --sheet Sampel --terima 0.9
+
+Nama yang berubah antar rilis BPS (ejaan, awalan "Kabupaten"/"Kota", pemekaran) dicari
+kandidatnya di GeoJSON dengan kemiripan trigram karakter (koefisien Dice), hanya di antara
+wilayah provinsi yang sama (jika provinsinya ada di GeoJSON). Saran dihitung saat indeks
+join dibangun (modules/geo.py), yaitu sekali per dataset yang di-ingest. Saran yang
+diterima disimpan di tabel alias (CSV) dan dipakai oleh join berikutnya.
+"""
+import os
+import re
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from modules.geo import _normalize_name_series, _make_join_key
+from utils.cache import file_hash
+
+ALIAS_PATH = r'geojson/alias_wilayah.csv'
+KOLOM_ALIAS = ['prov', 'nama_data', 'nama_peta']
+
+# Saran dengan skor di bawah ini tidak ditampilkan
+SKOR_MINIMUM = 0.4
+# Bobot kesamaan jenis wilayah (kabupaten/kota) terhadap kemiripan nama
+BOBOT_JENIS = 0.1
+
+# Awalan jenis wilayah setelah _normalize_name_series
+_POLA_JENIS = re.compile(r"^(?:(KOTA)|KAB\.)(?: ADMINISTRASI)?\s+|^ADMINISTRASI\s+")
+
+# PencocokNama per hash GeoJSON
+_pencocok_memo = {}
+
+
+def kunci_alias(path=ALIAS_PATH):
+    """Hash tabel alias (string kosong jika belum ada); bagian dari kunci cache indeks join."""
+    return file_hash(path) if os.path.exists(path) else ""
+
+
+def muat_alias(path=ALIAS_PATH):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=KOLOM_ALIAS)
+    return pd.read_csv(path, dtype=str, keep_default_na=False)[KOLOM_ALIAS]
+
+
+def simpan_alias(baris, path=ALIAS_PATH):
+    """Menambahkan alias (DataFrame prov, nama_data, nama_peta); alias lama untuk nama yang sama diganti."""
+    alias = pd.concat([muat_alias(path), baris[KOLOM_ALIAS].astype(str)], ignore_index=True)
+    kunci = _kunci_data(alias['prov'], alias['nama_data'])
+    alias = alias[~kunci.duplicated(keep='last').to_numpy()].sort_values(['prov', 'nama_data'])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    alias.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return len(alias)
+
+
+def _kunci_data(prov, nama):
+    prov = _normalize_name_series(pd.Series(prov, dtype=object).astype(str))
+    nama = _make_join_key(_normalize_name_series(pd.Series(nama, dtype=object).astype(str)))
+    return prov.str.cat(nama.to_numpy(), sep="|")
+
+
+def terapkan_alias(join_name, prov_d, alias):
+    """join_name data setelah alias: nama yang ada di tabel alias diganti join key nama peta."""
+    if alias.empty:
+        return join_name
+    tujuan = pd.Series(
+        _make_join_key(_normalize_name_series(alias['nama_peta'])).to_numpy(),
+        index=_kunci_data(alias['prov'], alias['nama_data']).to_numpy(),
+    )
+    tujuan = tujuan[~tujuan.index.duplicated(keep='last')]
+    kunci = pd.Series(prov_d, dtype=object).astype(str).str.cat(pd.Series(join_name, dtype=object).astype(str), sep="|")
+    ganti = kunci.map(tujuan)
+    return pd.Series(np.where(ganti.notna(), ganti, join_name), index=getattr(join_name, 'index', None))
+
+
+def _pisah_jenis(norm_name):
+    """(is_kota, nama inti tanpa awalan KAB./KOTA/ADMINISTRASI) dari nama ternormalisasi."""
+    cocok = norm_name.str.extract(_POLA_JENIS)
+    is_kota = cocok[0].notna().to_numpy()
+    inti = norm_name.str.replace(_POLA_JENIS, "", regex=True).str.strip()
+    return is_kota, inti
+
+
+class PencocokNama:
+    """Indeks trigram nama inti wilayah GeoJSON, dikelompokkan per provinsi."""
+
+    def __init__(self, gdf):
+        self.nama = gdf['orig_name'].astype(str).to_numpy(dtype=object)
+        self.prov = gdf['prov_g'].astype(str).to_numpy(dtype=object)
+        self.is_kota, inti = _pisah_jenis(gdf['norm_name'])
+        self._vektor = CountVectorizer(analyzer='char_wb', ngram_range=(3, 3), binary=True, lowercase=False, dtype=np.float32)
+        matriks = self._vektor.fit_transform(inti).tocsr()
+        jumlah = np.asarray(matriks.sum(axis=1)).ravel()
+        # Per provinsi: (posisi baris GeoJSON, matriks trigram transpos (dense, blok kecil), jumlah trigram);
+        # None = semua wilayah, untuk provinsi yang tidak ada di GeoJSON
+        self._blok = {}
+        for p in [None, *np.unique(self.prov)]:
+            posisi = np.arange(len(self.nama)) if p is None else np.flatnonzero(self.prov == p)
+            self._blok[p] = (posisi, matriks[posisi].T.toarray(), jumlah[posisi])
+
+    def sarankan(self, nama, prov, top_n=3, skor_minimum=SKOR_MINIMUM):
+        """
+        Saran nama peta untuk setiap (nama, prov) data, urut skor. Kolom: nama_data, prov,
+        nama_peta, prov_peta, skor, peringkat, posisi_peta (baris GeoJSON).
+        """
+        nama = pd.Series(nama, dtype=object).astype(str).reset_index(drop=True)
+        prov_d = _normalize_name_series(pd.Series(prov, dtype=object).astype(str)).to_numpy(dtype=object)
+        is_kota, inti = _pisah_jenis(_normalize_name_series(nama))
+        # Kueri diurutkan per provinsi agar tiap blok berupa potongan baris yang bersebelahan
+        urutan = np.argsort(prov_d, kind='stable')
+        kueri = self._vektor.transform(inti.iloc[urutan]).tocsr()
+        jumlah_kueri = np.asarray(kueri.sum(axis=1)).ravel()
+        prov_urut, kota_urut = prov_d[urutan], is_kota[urutan]
+        awal_blok = np.flatnonzero(np.r_[True, prov_urut[1:] != prov_urut[:-1]]) if len(urutan) else []
+
+        bagian = []
+        for awal, akhir in zip(awal_blok, [*awal_blok[1:], len(urutan)]):
+            # Provinsi yang tidak ada di GeoJSON (nama provinsi berubah): cari di semua wilayah
+            posisi, matriks_t, jumlah = self._blok.get(prov_urut[awal], self._blok[None])
+            irisan = kueri[awal:akhir] @ matriks_t
+            dice = 2 * irisan / np.maximum(jumlah_kueri[awal:akhir, None] + jumlah[None, :], 1)
+            jenis_sama = kota_urut[awal:akhir, None] == self.is_kota[posisi][None, :]
+            skor = (1 - BOBOT_JENIS) * dice + BOBOT_JENIS * jenis_sama
+            k = min(top_n, len(posisi))
+            terbaik = np.argsort(-skor, axis=1, kind='stable')[:, :k]
+            skor_terbaik = np.take_along_axis(skor, terbaik, axis=1)
+            baris, kolom = np.nonzero(skor_terbaik >= skor_minimum)
+            bagian.append((urutan[awal + baris], posisi[terbaik[baris, kolom]], skor_terbaik[baris, kolom], kolom + 1))
+
+        if not bagian:
+            return pd.DataFrame(columns=['nama_data', 'prov', 'nama_peta', 'prov_peta', 'skor', 'peringkat', 'posisi_peta'])
+        data_pos, peta_pos, skor, peringkat = (np.concatenate(x) for x in zip(*bagian))
+        urut = np.lexsort((peringkat, data_pos))
+        data_pos, peta_pos = data_pos[urut], peta_pos[urut]
+        return pd.DataFrame({
+            'nama_data': nama.to_numpy(dtype=object)[data_pos],
+            'prov': prov_d[data_pos],
+            'nama_peta': self.nama[peta_pos],
+            'prov_peta': self.prov[peta_pos],
+            'skor': skor[urut].astype(float),
+            'peringkat': peringkat[urut],
+            'posisi_peta': peta_pos,
+        })
+
+
+def pencocok_untuk(gdf, kunci_geo):
+    """PencocokNama untuk GeoJSON ini, dibuat sekali per proses."""
+    if kunci_geo not in _pencocok_memo:
+        _pencocok_memo[kunci_geo] = PencocokNama(gdf)
+    return _pencocok_memo[kunci_geo]
+
+
+def main(argv=None):
+    from modules.data_processing import daftar_sheet
+    from modules.engine import siapkan_data, LogProses
+    from modules.geo import indeks_join
+
+    parser = argparse.ArgumentParser(description="Saran alias untuk nama wilayah data yang tidak ada di GeoJSON.")
+    parser.add_argument("--path", default="DATASET.xlsx", help="File Excel dataset")
+    parser.add_argument("--sheet", nargs="+", default=None, help="Nama sheet (default: semua sheet)")
+    parser.add_argument("--terima", type=float, default=None, metavar="SKOR",
+                        help="Simpan saran peringkat 1 dengan skor >= SKOR ke tabel alias")
+    args = parser.parse_args(argv)
+
+    for sheet in args.sheet or daftar_sheet(args.path):
+        identitas = siapkan_data(args.path, sheet).identitas.reset_index(drop=True)
+        saran = indeks_join(identitas, LogProses()).saran
+        print(f"{sheet}: {saran['nama_data'].nunique()} nama tanpa poligon", file=sys.stderr)
+        for _, s in saran.iterrows():
+            print(f"  {s['nama_data']} ({s['prov']}) -> {s['nama_peta']} [{s['skor']:.2f}]", file=sys.stderr)
+        if args.terima is not None:
+            terima = saran[(saran['peringkat'] == 1) & (saran['skor'] >= args.terima)]
+            if not terima.empty:
+                simpan_alias(terima)
+                print(f"  {len(terima)} alias disimpan ke {ALIAS_PATH}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Atlas hasil clustering mode optimal yang dihitung sebelumnya untuk semua split.
+
+Contoh:
+    python -m modules.atlas
+    python -m modules.atlas --sheet Populasi Sampel --workers 4
+
+Untuk setiap sheet, atlas menyimpan hasil K-Means (K optimal) dan DBSCAN (Epsilon &
+MinPts optimal) setiap split, vektor label peta yang sudah sejajar dengan baris GeoJSON,
+dan nilai silhouette per wilayah untuk silhouette plot. Halaman Clustering mencari
+konfigurasi di atlas lebih dulu, sehingga mode optimal tidak memakan CPU per pengunjung.
+Atlas tidak dipakai lagi bila isi dataset, GeoJSON atau tabel alias wilayah berubah;
+jalankan ulang build-nya.
+"""
+import os
+import sys
+import time
+import pickle
+import argparse
+import dataclasses
+
+from modules.data_processing import parse_nama_split, dataset_cache_key, daftar_sheet
+from modules.engine import fingerprint_hasil, LogProses, METODE
+from modules.batch import jalankan_semua, params_optimal
+from modules.geo import GEOJSON_PATH, indeks_join, label_peta
+from modules.alias import kunci_alias
+from utils.cache import file_hash, safe_name
+
+ATLAS_DIR = "atlas"
+ATLAS_VERSI = 2
+
+# Atlas yang sudah dimuat per file, divalidasi ulang dengan mtime
+_atlas_memo = {}
+
+
+def atlas_file(sheet):
+    return os.path.join(ATLAS_DIR, f"atlas_{safe_name(sheet)}.pkl")
+
+
+def _tahun_pilihan(nama):
+    _, tahun = parse_nama_split(nama)
+    return (str(tahun[0]), str(tahun[-1]))
+
+
+def _varian_params(metode, k_range):
+    """
+    Parameter UI yang dijawab oleh satu entri atlas. DBSCAN dihitung sekali dengan
+    sensitivitas, lalu dipakai juga untuk permintaan tanpa heatmap sensitivitas.
+    """
+    params = params_optimal(metode, k_range)
+    if metode == "K-Means":
+        return params, [params]
+    lengkap = dict(params, sensitivitas_dbscan=True)
+    return lengkap, [lengkap, dict(params, sensitivitas_dbscan=False)]
+
+
+def _peta_dasar(identitas):
+    """GeoDataFrame dasar (Cluster kosong) dan baris data tiap baris peta (-1 jika wilayah tidak cocok)."""
+    indeks = indeks_join(identitas.reset_index(drop=True), LogProses())
+    if indeks is None:
+        return None, None
+    return indeks.gdf_dasar, indeks.data_pos
+
+
+def bangun_atlas(path, sheet, k_range=(2, 6), workers=None, log=print):
+    """Menghitung semua split x metode mode optimal untuk satu sheet dan menyimpan atlasnya."""
+    start = time.perf_counter()
+    params = {m: _varian_params(m, k_range)[0] for m in METODE}
+    data, konfigurasi, hasil_semua = jalankan_semua(
+        path, sheet, k_range=k_range, workers=workers, log=log,
+        params=params,
+    )
+    gdf_dasar, posisi = _peta_dasar(data.identitas)
+    if gdf_dasar is None:
+        raise ValueError("Kolom nama wilayah di GeoJSON tidak terdeteksi; atlas tidak dapat dibuat.")
+
+    entri = {}
+    for nama, metode in konfigurasi:
+        hasil = hasil_semua[(nama, metode)]
+        hasil = dataclasses.replace(hasil, cache_hit=False, extractor=None)
+        isi = {
+            'nama': nama,
+            'hasil': hasil,
+            'label_peta': label_peta(posisi, hasil.labels),
+            'silhouette_samples': hasil.silhouette_samples,
+        }
+        var, _ = parse_nama_split(nama)
+        for varian in _varian_params(metode, k_range)[1]:
+            isi_varian = isi
+            if not varian.get('sensitivitas_dbscan', True):
+                isi_varian = dict(isi, hasil=dataclasses.replace(
+                    hasil, sensitivity_data=None, params=dict(hasil.params, **varian),
+                ))
+            kunci = fingerprint_hasil(path, sheet, var, _tahun_pilihan(nama), metode, varian)
+            entri[kunci] = isi_varian
+
+    atlas = {
+        'versi': ATLAS_VERSI,
+        'dataset': dataset_cache_key(path, sheet),
+        'geojson': file_hash(GEOJSON_PATH),
+        'alias': kunci_alias(),
+        'identitas': data.identitas,
+        'data_clean': data.data_clean,
+        'data_splits': data.data_splits,
+        'gdf_dasar': gdf_dasar,
+        'entri': entri,
+    }
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    tujuan = atlas_file(sheet)
+    tmp = f"{tujuan}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(atlas, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, tujuan)
+    log(f"Atlas '{sheet}': {len(konfigurasi)} konfigurasi -> {tujuan} "
+        f"({os.path.getsize(tujuan) / 1024 ** 2:.1f} MB, {time.perf_counter() - start:.1f} s)")
+    return tujuan
+
+
+def muat_atlas(path, sheet):
+    """Atlas untuk sheet jika ada dan masih sesuai dengan dataset & GeoJSON saat ini, atau None."""
+    tujuan = atlas_file(sheet)
+    try:
+        mtime = os.stat(tujuan).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    memo = _atlas_memo.get(tujuan)
+    if memo is None or memo[0] != mtime:
+        with open(tujuan, "rb") as f:
+            memo = (mtime, pickle.load(f))
+        _atlas_memo[tujuan] = memo
+    atlas = memo[1]
+    return atlas if _atlas_sesuai(atlas, path, sheet) else None
+
+
+def _atlas_sesuai(atlas, path, sheet):
+    return (
+        atlas.get('versi') == ATLAS_VERSI
+        and atlas.get('dataset') == dataset_cache_key(path, sheet)
+        and os.path.exists(GEOJSON_PATH)
+        and atlas.get('geojson') == file_hash(GEOJSON_PATH)
+        and atlas.get('alias') == kunci_alias()
+    )
+
+
+def atlas_usang(path, sheet):
+    """True jika atlas sheet ada tetapi tidak sesuai lagi (mis. tabel alias berubah) sehingga perlu dibangun ulang."""
+    return os.path.exists(atlas_file(sheet)) and muat_atlas(path, sheet) is None
+
+
+def cari_atlas(path, sheet, var, tahun_pilihan, metode, params):
+    """(atlas, entri) untuk konfigurasi ini, atau None jika tidak ada di atlas."""
+    if params.get('live_eps'):
+        return None
+    atlas = muat_atlas(path, sheet)
+    if atlas is None:
+        return None
+    isi = atlas['entri'].get(fingerprint_hasil(path, sheet, var, tahun_pilihan, metode, params))
+    if isi is None:
+        return None
+    return atlas, isi
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Membangun atlas hasil clustering mode optimal untuk halaman Clustering.")
+    parser.add_argument("--path", default="DATASET.xlsx", help="File Excel dataset")
+    parser.add_argument("--sheet", nargs="+", default=None, help="Nama sheet (default: semua sheet)")
+    parser.add_argument("--k-range", nargs=2, type=int, default=(2, 6), metavar=("K_MIN", "K_MAX"), help="Rentang K optimal")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah worker process (default: jumlah CPU)")
+    args = parser.parse_args(argv)
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    for sheet in args.sheet or daftar_sheet(args.path):
+        bangun_atlas(args.path, sheet, k_range=args.k_range, workers=args.workers, log=log)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Clustering batch tanpa UI untuk semua kombinasi split (variabel x rentang tahun) x metode.
+
+Contoh:
+    python -m modules.batch --output hasil_batch.parquet
+    python -m modules.batch --sheet Sampel --metode DBSCAN --output hasil_dbscan.csv --workers 8
+
+Data dimuat dan dipreprocessing sekali di proses utama lalu dibagikan ke worker
+(ProcessPoolExecutor). Setiap konfigurasi memakai logika optimal yang sama dengan
+halaman Clustering (K optimal / Epsilon & MinPts optimal) lewat modules/engine.py.
+Output: satu tabel (Parquet atau CSV) berisi label per wilayah per konfigurasi
+beserta parameter terpilih dan skor Silhouette/DBI.
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from modules.data_processing import parse_nama_split, VAR_INDIKATOR
+from modules.engine import siapkan_data, jalankan_clustering, jalankan_dengan_cache, METODE
+
+# State per worker, diisi sekali oleh _init_worker
+_WORKER = {}
+
+
+def params_optimal(metode, k_range=(2, 6)):
+    """Parameter mode optimal, sama dengan default halaman Clustering."""
+    if metode == "K-Means":
+        return {'optimal_k': True, 'k_range': tuple(k_range)}
+    return {'optimal_dbscan': True, 'use_pca_manual': True}
+
+
+def daftar_konfigurasi(data_splits, vars_=None, metode=None):
+    """Semua (nama_split, metode) dari split yang dihasilkan bagi_data, difilter var/metode."""
+    vars_ = set(vars_ or VAR_INDIKATOR)
+    metode = list(metode or METODE)
+    return [
+        (nama, m)
+        for nama in data_splits
+        if parse_nama_split(nama)[0] in vars_
+        for m in metode
+    ]
+
+
+def _init_worker(path, sheet, data_splits, params, pakai_cache):
+    # Satu thread BLAS/OpenMP per worker agar tidak berebut core dengan worker lain
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except Exception:
+        pass
+    _WORKER.update(path=path, sheet=sheet, data_splits=data_splits, params=params, pakai_cache=pakai_cache)
+
+
+def _jalankan_satu(nama, metode):
+    var, tahun = parse_nama_split(nama)
+    data_splits = _WORKER['data_splits']
+    data = data_splits[nama]
+    params = dict(_WORKER['params'][metode])
+    if _WORKER['pakai_cache']:
+        tahun_pilihan = (str(tahun[0]), str(tahun[-1]))
+        hasil = jalankan_dengan_cache(
+            _WORKER['path'], _WORKER['sheet'], var, tahun_pilihan, metode, params, data,
+            scaler=data_splits.scaler,
+        )
+    else:
+        hasil = jalankan_clustering(data, metode, params, scaler=data_splits.scaler)
+    hasil.extractor = None
+    return nama, metode, hasil
+
+
+def _baris_hasil(identitas, nama, metode, hasil):
+    """Tabel panjang: satu baris per wilayah untuk satu konfigurasi."""
+    var, tahun = parse_nama_split(nama)
+    labels = np.asarray(hasil.labels)
+    valid = labels != -1
+    df = identitas.reset_index(drop=True).copy()
+    df['split'] = nama
+    df['var'] = var
+    df['tahun_awal'] = tahun[0]
+    df['tahun_akhir'] = tahun[-1]
+    df['metode'] = metode
+    df['Cluster'] = labels
+    df['Point Type'] = hasil.point_type if hasil.point_type is not None else None
+    df['k'] = hasil.params.get('k') if metode == "K-Means" else None
+    df['eps'] = hasil.params.get('eps') if metode == "DBSCAN" else None
+    df['minpts'] = hasil.params.get('minpts') if metode == "DBSCAN" else None
+    df['jumlah_cluster'] = len(np.unique(labels[valid]))
+    df['rasio_noise'] = float(1 - valid.mean())
+    df['silhouette'] = hasil.silhouette
+    df['dbi'] = hasil.dbi
+    df['waktu_detik'] = sum(hasil.waktu.values())
+    df['cache_hit'] = hasil.cache_hit
+    return df
+
+
+def jalankan_semua(path, sheet, vars_=None, metode=None, k_range=(2, 6), workers=None, pakai_cache=True, log=print,
+                   params=None):
+    """
+    Menjalankan semua konfigurasi di process pool. params: {metode: params} untuk
+    mengganti params_optimal (mis. atlas yang juga menghitung sensitivitas DBSCAN).
+    Mengembalikan (DataAnalisis, daftar konfigurasi, {(nama_split, metode): HasilClustering}).
+    """
+    start = time.perf_counter()
+    data = siapkan_data(path, sheet)
+    konfigurasi = daftar_konfigurasi(data.data_splits, vars_, metode)
+    params = params or {m: params_optimal(m, k_range) for m in METODE}
+    workers = workers or os.cpu_count() or 1
+    log(f"{len(konfigurasi)} konfigurasi, {workers} worker (data dimuat dalam {time.perf_counter() - start:.1f} s)")
+
+    hasil_semua = {}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(path, sheet, data.data_splits, params, pakai_cache),
+    ) as executor:
+        futures = [executor.submit(_jalankan_satu, nama, m) for nama, m in konfigurasi]
+        for i, future in enumerate(as_completed(futures), 1):
+            nama, m, hasil = future.result()
+            hasil_semua[(nama, m)] = hasil
+            sil = f"{hasil.silhouette:.4f}" if hasil.silhouette is not None else "N/A"
+            log(f"[{i}/{len(konfigurasi)}] {nama} {m}: Silhouette={sil}{' (cache)' if hasil.cache_hit else ''}")
+
+    log(f"Selesai dalam {time.perf_counter() - start:.1f} s")
+    return data, konfigurasi, hasil_semua
+
+
+def jalankan_batch(path, sheet, vars_=None, metode=None, k_range=(2, 6), workers=None, pakai_cache=True, log=print):
+    """Menjalankan semua konfigurasi dan mengembalikan tabel hasil gabungan."""
+    data, konfigurasi, hasil_semua = jalankan_semua(path, sheet, vars_, metode, k_range, workers, pakai_cache, log)
+    return pd.concat(
+        [_baris_hasil(data.identitas, nama, m, hasil_semua[(nama, m)]) for nama, m in konfigurasi],
+        ignore_index=True,
+    )
+
+
+def simpan_tabel(tabel, output):
+    """Menyimpan ke Parquet atau CSV sesuai ekstensi file output."""
+    if output.lower().endswith(".csv"):
+        tabel.to_csv(output, index=False)
+    else:
+        tabel.to_parquet(output, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clustering batch TPT/TPAK untuk semua variabel, rentang tahun dan metode.")
+    parser.add_argument("--path", default="DATASET.xlsx", help="File Excel dataset")
+    parser.add_argument("--sheet", default="Populasi", help="Nama sheet")
+    parser.add_argument("--output", default="hasil_batch.parquet", help="File output (.parquet atau .csv)")
+    parser.add_argument("--var", nargs="+", choices=list(VAR_INDIKATOR), help="Variabel (default: semua)")
+    parser.add_argument("--metode", nargs="+", choices=list(METODE), help="Metode (default: semua)")
+    parser.add_argument("--k-range", nargs=2, type=int, default=(2, 6), metavar=("K_MIN", "K_MAX"), help="Rentang K optimal")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah worker process (default: jumlah CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="Jangan pakai/isi cache hasil clustering")
+    args = parser.parse_args(argv)
+
+    tabel = jalankan_batch(
+        args.path, args.sheet, vars_=args.var, metode=args.metode, k_range=args.k_range,
+        workers=args.workers, pakai_cache=not args.no_cache,
+        log=lambda msg: print(msg, file=sys.stderr),
+    )
+    simpan_tabel(tabel, args.output)
+    print(f"{tabel['split'].nunique()} split x {tabel['metode'].nunique()} metode -> {args.output} ({len(tabel)} baris)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Benchmark jalur utama preprocessing, clustering dan peta.
+
+Contoh:
+    python -m modules.benchmark --output baseline.json
+    python -m modules.benchmark --baseline baseline.json --output hasil.json
+    python -m modules.benchmark --skala 1 10 --langkah kmeans_clustering sweep_k --ulang 5
+    python -m modules.benchmark --sintetis --skala 10 100 --langkah geo_load geo_merge create_folium_map
+
+Setiap langkah dijalankan pada dataset bawaan (skala 1) dan salinan sintetis yang
+diperbesar (x10, x100 baris: baris asli digandakan dengan sedikit noise dan nama
+wilayah unik). Salinan ditulis ke Excel sementara sehingga muat_data ikut diukur.
+Nama salinan tidak ada di GeoJSON, jadi di atas skala 1 langkah peta memakai poligon
+sintetis (modules/sintetis.py) satu per baris salinan.
+Cache (.cache) dialihkan ke folder sementara agar hasil selalu mengukur jalur dingin
+dan tidak mengotori cache aplikasi. Dengan --sintetis, data dibuat oleh modules/sintetis.py
+beserta poligon yang cocok sehingga jalur peta ikut membesar. Hasil disimpan sebagai JSON;
+dengan --baseline, median tiap langkah dibandingkan dan exit code 1 jika ada regresi.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+from importlib.metadata import version, PackageNotFoundError
+
+import numpy as np
+import pandas as pd
+
+import utils.cache
+from modules import data_processing
+from modules.data_processing import (
+    muat_data, preprocessing_data, bagi_data, kmeans_clustering, dbscan_clustering, nama_split, daftar_tahun,
+)
+from modules.engine import LogProses, cari_k_optimal, cari_minpts_optimal
+from modules.distance import DistanceCache
+
+BENCHMARK_VERSI = 1
+
+LANGKAH = (
+    "muat_data",
+    "muat_data_cache",
+    "preprocessing_data",
+    "bagi_data",
+    "kmeans_clustering",
+    "dbscan_clustering",
+    "sweep_k",
+    "sweep_minpts",
+    "geo_load",
+    "geo_merge",
+    "create_folium_map",
+)
+
+# Selisih median di bawah ini (detik) dianggap noise, bukan regresi
+AMBANG_ABSOLUT = 0.005
+
+
+def skala_data(df, faktor, seed=42):
+    """
+    Salinan dataset dengan jumlah baris x faktor. Salinan ke-0 sama dengan aslinya; salinan
+    lain diberi noise kecil (5% std kolom) pada sel numerik, sel '-' tetap '-', dan nama
+    kab_kota diberi akhiran '#n' agar unik.
+    """
+    if faktor <= 1:
+        return df.copy()
+    rng = np.random.default_rng(seed)
+    kolom_nilai = [c for c in df.columns if c not in ('prov', 'kab_kota')]
+    salinan = []
+    for r in range(faktor):
+        df_r = df.copy()
+        if r > 0:
+            df_r['kab_kota'] = df_r['kab_kota'].astype(str) + f" #{r}"
+            for c in kolom_nilai:
+                angka = pd.to_numeric(df_r[c], errors='coerce')
+                noise = rng.normal(0, 0.05 * (angka.std() or 1.0), len(angka))
+                baru = (angka + noise).round(2)
+                df_r[c] = baru.astype(object).where(angka.notna(), df_r[c])
+        salinan.append(df_r)
+    return pd.concat(salinan, ignore_index=True)
+
+
+def _ukur(fungsi, ulang, siapkan=None):
+    """Menjalankan fungsi sebanyak ulang kali; siapkan() dipanggil sebelum tiap ulangan (tidak diukur)."""
+    durasi, hasil = [], None
+    for _ in range(ulang):
+        if siapkan is not None:
+            siapkan()
+        start = time.perf_counter()
+        hasil = fungsi()
+        durasi.append(time.perf_counter() - start)
+    return durasi, hasil
+
+
+def _kosongkan_memo_sheet(path, hapus_cache=True):
+    data_processing._sheet_memo.pop(os.path.abspath(path), None)
+    if hapus_cache:
+        shutil.rmtree(os.path.join(utils.cache.CACHE_DIR, "dataset"), ignore_errors=True)
+
+
+def _kosongkan_memo_geo():
+    """GeoJSON, indeks join dan pencocok nama dilupakan (memori proses dan .cache/geo) agar tiap ulangan dingin."""
+    from modules import geo, alias
+    geo._geo_memo.clear()
+    geo._join_memo.clear()
+    alias._pencocok_memo.clear()
+    shutil.rmtree(os.path.join(utils.cache.CACHE_DIR, "geo"), ignore_errors=True)
+
+
+def jalankan_skala(df_asli, sheet, faktor, langkah, ulang, folder, log=print, sintetis=False):
+    """Semua langkah terpilih untuk satu skala. Mengembalikan daftar hasil per langkah."""
+    from modules.geo import buat_gdf_peta
+    from modules.plot import create_folium_map
+
+    geojson_path = None
+    if sintetis:
+        from modules.sintetis import buat_panel, buat_poligon
+        df_raw = buat_panel(len(df_asli) * faktor)
+        geojson_path = os.path.join(folder, f"benchmark_x{faktor}.geojson")
+        buat_poligon(df_raw).to_file(geojson_path, driver="GeoJSON")
+    else:
+        df_raw = skala_data(df_asli, faktor)
+        if faktor > 1 and {"geo_load", "geo_merge", "create_folium_map"} & set(langkah):
+            # Nama salinan ('#n') tidak ada di GeoJSON; langkah peta memakai poligon sintetis
+            # satu per baris agar join tetap mengukur wilayah yang cocok
+            from modules.sintetis import buat_poligon
+            geojson_path = os.path.join(folder, f"benchmark_x{faktor}.geojson")
+            buat_poligon(df_raw).to_file(geojson_path, driver="GeoJSON")
+            log(f"  x{faktor}: langkah peta memakai poligon sintetis ({len(df_raw)} wilayah)")
+    path = os.path.join(folder, f"benchmark_x{faktor}.xlsx")
+    df_raw.to_excel(path, sheet_name=sheet, index=False)
+
+    hasil = []
+
+    def catat(nama, durasi, **info):
+        hasil.append({
+            'skala': faktor, 'baris': len(df_raw), 'langkah': nama,
+            'median_s': statistics.median(durasi), 'min_s': min(durasi), 'durasi_s': durasi, **info,
+        })
+        log(f"  x{faktor:<4} {nama:<20} median {statistics.median(durasi):8.4f} s")
+
+    if "muat_data" in langkah:
+        durasi, _ = _ukur(lambda: muat_data(path, sheet), ulang, siapkan=lambda: _kosongkan_memo_sheet(path))
+        catat("muat_data", durasi)
+    if "muat_data_cache" in langkah:
+        muat_data(path, sheet)
+        durasi, _ = _ukur(lambda: muat_data(path, sheet), ulang,
+                          siapkan=lambda: _kosongkan_memo_sheet(path, hapus_cache=False))
+        catat("muat_data_cache", durasi)
+
+    durasi, keluaran = _ukur(lambda: preprocessing_data(df_raw), ulang if "preprocessing_data" in langkah else 1)
+    if "preprocessing_data" in langkah:
+        catat("preprocessing_data", durasi)
+    data_norm, scaler = keluaran[3], keluaran[4].scaler
+
+    if "bagi_data" in langkah:
+        # Termasuk membentuk semua split (DataSplits membentuknya saat diakses)
+        def _semua_split():
+            splits = bagi_data(data_norm, scaler=scaler)
+            return [splits[nama] for nama in splits]
+        durasi, _ = _ukur(_semua_split, ulang)
+        catat("bagi_data", durasi)
+
+    # Split terbesar (semua variabel & tahun) sebagai input clustering
+    tahun = daftar_tahun(data_norm)
+    data = bagi_data(data_norm, scaler=scaler)[nama_split("tpt_tpak", tahun)]
+    D = data.shape[1]
+    info = {'fitur': D}
+
+    if "kmeans_clustering" in langkah:
+        durasi, _ = _ukur(lambda: kmeans_clustering(data, 3), ulang)
+        catat("kmeans_clustering", durasi, k=3, **info)
+    if "dbscan_clustering" in langkah:
+        durasi, _ = _ukur(lambda: dbscan_clustering(data, 1.0, D + 1), ulang)
+        catat("dbscan_clustering", durasi, eps=1.0, minpts=D + 1, **info)
+    if "sweep_k" in langkah:
+        # DistanceCache dibuat di dalam pengukuran, sama seperti satu run_analysis
+        durasi, _ = _ukur(lambda: cari_k_optimal(data, range(2, 7), dist=DistanceCache(data)), ulang)
+        catat("sweep_k", durasi, k_range=[2, 6], **info)
+    if "sweep_minpts" in langkah:
+        rentang = range(D + 1, 21)
+        durasi, _ = _ukur(lambda: cari_minpts_optimal(data, rentang, dist=DistanceCache(data)), ulang)
+        catat("sweep_minpts", durasi, minpts_range=[rentang.start, rentang.stop - 1], **info)
+
+    if {"geo_load", "geo_merge", "create_folium_map"} & set(langkah):
+        df_hasil = pd.concat([df_raw[['prov', 'kab_kota']].reset_index(drop=True), data.reset_index(drop=True)], axis=1)
+        df_hasil['Cluster'] = np.arange(len(df_hasil)) % 3
+        waktu_geo = {'geo': [], 'merge': []}
+        gdf = None
+        for _ in range(ulang):
+            _kosongkan_memo_geo()
+            waktu = {}
+            gdf = buat_gdf_peta(df_hasil, LogProses(), waktu=waktu, geojson_path=geojson_path)
+            waktu_geo['geo'].append(waktu['geo'])
+            waktu_geo['merge'].append(waktu['merge'])
+        if "geo_load" in langkah:
+            catat("geo_load", waktu_geo['geo'])
+        if "geo_merge" in langkah:
+            catat("geo_merge", waktu_geo['merge'])
+        if "create_folium_map" in langkah and gdf is not None:
+            durasi, _ = _ukur(lambda: create_folium_map(gdf, key_column='join_name'), ulang)
+            catat("create_folium_map", durasi, poligon=len(gdf))
+    return hasil
+
+
+def info_mesin():
+    paket = {}
+    for nama in ("numpy", "pandas", "scikit-learn", "geopandas", "folium", "openpyxl", "pyarrow"):
+        try:
+            paket[nama] = version(nama)
+        except PackageNotFoundError:
+            paket[nama] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu': os.cpu_count(),
+        'paket': paket,
+    }
+
+
+def jalankan_benchmark(path="DATASET.xlsx", sheet="Populasi", skala=(1, 10, 100), langkah=LANGKAH, ulang=3, log=print,
+                       sintetis=False):
+    """Menjalankan benchmark untuk semua skala dengan cache sementara; mengembalikan dict hasil (siap JSON)."""
+    df_asli = pd.read_excel(path, sheet_name=sheet, dtype={'kab_kota': str})
+    cache_asli = utils.cache.CACHE_DIR
+    folder = tempfile.mkdtemp(prefix="benchmark_")
+    utils.cache.CACHE_DIR = os.path.join(folder, "cache")
+    hasil = []
+    try:
+        for faktor in skala:
+            log(f"Skala x{faktor} ({len(df_asli) * faktor} baris)...")
+            hasil.extend(jalankan_skala(df_asli, sheet, faktor, langkah, ulang, folder, log=log, sintetis=sintetis))
+    finally:
+        utils.cache.CACHE_DIR = cache_asli
+        shutil.rmtree(folder, ignore_errors=True)
+    return {
+        'versi': BENCHMARK_VERSI,
+        'waktu': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'dataset': {'path': path, 'sheet': sheet, 'sintetis': sintetis},
+        'ulang': ulang,
+        'mesin': info_mesin(),
+        'hasil': hasil,
+    }
+
+
+def bandingkan(hasil, baseline, toleransi=0.2):
+    """
+    Membandingkan median per (skala, langkah) dengan baseline. Regresi jika lebih lambat
+    dari baseline x (1 + toleransi) dan selisihnya di atas AMBANG_ABSOLUT.
+    """
+    dasar = {(h['skala'], h['langkah']): h['median_s'] for h in baseline.get('hasil', [])}
+    baris = []
+    for h in hasil['hasil']:
+        kunci = (h['skala'], h['langkah'])
+        if kunci not in dasar:
+            continue
+        lama, baru = dasar[kunci], h['median_s']
+        rasio = baru / lama if lama > 0 else float('inf')
+        baris.append({
+            'skala': h['skala'], 'langkah': h['langkah'], 'baseline_s': lama, 'sekarang_s': baru, 'rasio': rasio,
+            'regresi': rasio > 1 + toleransi and baru - lama > AMBANG_ABSOLUT,
+        })
+    return pd.DataFrame(baris, columns=['skala', 'langkah', 'baseline_s', 'sekarang_s', 'rasio', 'regresi'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing, clustering dan peta pada dataset bawaan dan salinan yang diperbesar.")
+    parser.add_argument("--path", default="DATASET.xlsx", help="File Excel dataset")
+    parser.add_argument("--sheet", default="Populasi", help="Nama sheet")
+    parser.add_argument("--skala", nargs="+", type=int, default=[1, 10, 100], help="Faktor pengali jumlah baris")
+    parser.add_argument("--langkah", nargs="+", choices=LANGKAH, default=list(LANGKAH), help="Langkah yang diukur (default: semua)")
+    parser.add_argument("--ulang", type=int, default=3, help="Jumlah ulangan per langkah (median dilaporkan)")
+    parser.add_argument("--output", default=None, help="File JSON hasil benchmark")
+    parser.add_argument("--baseline", default=None, help="File JSON baseline untuk dibandingkan")
+    parser.add_argument("--sintetis", action="store_true", help="Pakai data & poligon dari modules.sintetis, bukan salinan dataset")
+    parser.add_argument("--toleransi", type=float, default=0.2, help="Batas perlambatan relatif sebelum dianggap regresi (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    hasil = jalankan_benchmark(args.path, args.sheet, args.skala, args.langkah, args.ulang, log=log, sintetis=args.sintetis)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(hasil, f, indent=2)
+        log(f"Hasil disimpan ke {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        tabel = bandingkan(hasil, baseline, args.toleransi)
+        print(tabel.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+        if tabel['regresi'].any():
+            print(f"REGRESI: {int(tabel['regresi'].sum())} langkah lebih lambat dari baseline.")
+            return 1
+        print("Tidak ada regresi dibanding baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,24 +3,227 @@ import pandas as pd
 from sklearn.cluster import KMeans
 from sklearn.cluster import DBSCAN
 import time
+import os
+import re
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from collections.abc import Mapping
 import streamlit as st
+from utils.cache import file_hash, cache_path, safe_name
 
 # from utils.saveaspdf import generate_pdf_report
 
 #* 1. Membaca data
-def muat_data(path, sheet):
+KOLOM_IDENTITAS = ('prov', 'kab_kota')
+
+# Cache kolumnar (Parquet) per sheet, dikunci dengan hash isi workbook
+def dataset_cache_key(path, sheet):
+  return f"{safe_name(sheet)}_{file_hash(path)[:16]}"
+
+def _dataset_cache_file(path, sheet):
+  return cache_path("dataset", f"{dataset_cache_key(path, sheet)}.parquet")
+
+# Kolom campuran (angka + '-') disimpan sebagai string karena Arrow butuh satu tipe per kolom.
+# Daftar kolom campuran dicatat di metadata Parquet (attrs) agar kolom teks biasa tidak ikut di-decode
+ATTR_KOLOM_CAMPURAN = 'kolom_campuran'
+
+def _kolom_campuran(kolom):
+  return kolom.dtype == object and kolom.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool) and not pd.isna(v)).any()
+
+def _encode_mixed(df):
+  df_enc = df.copy()
+  campuran = [col for col in df_enc.columns if col not in KOLOM_IDENTITAS and _kolom_campuran(df_enc[col])]
+  for col in campuran:
+    df_enc[col] = df_enc[col].map(lambda v: None if pd.isna(v) else str(v))
+  df_enc.attrs[ATTR_KOLOM_CAMPURAN] = [str(col) for col in campuran]
+  return df_enc
+
+# Kembalikan kolom campuran: nilai yang bisa diparse jadi float, sisanya ('-') tetap string
+def _decode_mixed(df, campuran):
+  for col in campuran:
+    raw = df[col].astype(object)
+    num = pd.to_numeric(raw, errors='coerce')
+    df[col] = num.astype(object).where(num.notna() | raw.isna(), raw)
+  return df
+
+def _baca_cache(cache_file):
+  if not os.path.exists(cache_file):
+    return None
   try:
-    # Membaca data
-    df = pd.read_excel(path, sheet_name=sheet, dtype={'kab_kota': str})
-    # Ganti nilai NaN/None pada kolom 'kab_kota' (jika ada)
+    df = pd.read_parquet(cache_file)
+    # Cache lama tanpa daftar kolom campuran dibangun ulang
+    campuran = df.attrs.pop(ATTR_KOLOM_CAMPURAN, None)
+    if campuran is None:
+      return None
+    return _decode_mixed(df, campuran)
+  except Exception:
+    # Cache rusak/tidak terbaca: abaikan dan bangun ulang dari Excel
+    return None
+
+def _tulis_cache(df, cache_file):
+  try:
+    tmp_file = f"{cache_file}.tmp{os.getpid()}"
+    _encode_mixed(df).to_parquet(tmp_file, index=False)
+    os.replace(tmp_file, cache_file)
+  except Exception as e:
+    # Gagal menulis cache (mis. filesystem read-only) tidak boleh menggagalkan muat data
+    print(f"[cache] Gagal menulis cache {cache_file}: {e}")
+
+# Pembaca streaming (openpyxl read_only) untuk workbook besar (desa/kecamatan)
+STREAMING_MIN_BYTES = 5 * 1024 * 1024
+
+def _ke_float_kolom(nilai):
+  # Sama seperti replace_non_numeric: None, '-' dan teks non-angka -> NaN, dikonversi sekaligus per kolom
+  # (mis. "1,5" -> NaN, bukan 1.5, identik dengan jalur pd.read_excel)
+  kolom = pd.Series(nilai, dtype=object).replace({None: np.nan, '-': np.nan})
+  return pd.to_numeric(kolom, errors='coerce').to_numpy(dtype=float)
+
+def baca_excel_streaming(path, sheet, chunk_size=5000):
+  """Generator (header, potongan baris) dari sheet Excel tanpa memuat seluruh workbook (satu kali iter_rows)."""
+  from openpyxl import load_workbook
+
+  wb = load_workbook(path, read_only=True, data_only=True)
+  try:
+    ws = wb[sheet]
+    rows = ws.iter_rows(values_only=True)
+    header = [str(h) if h is not None else f"kolom_{i}" for i, h in enumerate(next(rows, ()))]
+    chunk = []
+    for row in rows:
+      # Lewati baris kosong di akhir sheet
+      if row is None or all(v is None for v in row):
+        continue
+      chunk.append(row)
+      if len(chunk) >= chunk_size:
+        yield header, chunk
+        chunk = []
+    if chunk or not header:
+      yield header, chunk
+  finally:
+    wb.close()
+
+def muat_data_streaming(path, sheet, chunk_size=5000):
+  """
+  Memuat sheet per potongan baris ke array float yang diperbesar bertahap.
+  Kolom identitas (prov, kab_kota) tetap teks; kolom lain dikonversi ke angka
+  ('-'/None -> NaN) per kolom untuk setiap potongan, sehingga memori puncak tidak
+  ikut membesar seperti pd.read_excel.
+  """
+  header, pos_identitas, pos_angka = None, [], []
+  values = ident = None
+  n = 0
+  for header_chunk, chunk in baca_excel_streaming(path, sheet, chunk_size):
+    if header is None:
+      header = header_chunk
+      pos_identitas = [i for i, h in enumerate(header) if h in KOLOM_IDENTITAS]
+      pos_angka = [i for i, h in enumerate(header) if h not in KOLOM_IDENTITAS]
+      values = np.full((max(len(chunk), 1), len(pos_angka)), np.nan)
+      ident = np.empty((len(values), len(pos_identitas)), dtype=object)
+
+    if n + len(chunk) > len(values):
+      kapasitas = max(2 * len(values), n + len(chunk))
+      values = np.vstack([values, np.full((kapasitas - len(values), values.shape[1]), np.nan)])
+      ident = np.vstack([ident, np.empty((kapasitas - len(ident), ident.shape[1]), dtype=object)])
+
+    # Baris yang lebih pendek dari header dilengkapi None
+    sel = np.empty((len(chunk), len(header)), dtype=object)
+    for r, baris in enumerate(chunk):
+      sel[r, :len(baris)] = baris[:len(header)]
+    for j, i in enumerate(pos_angka):
+      values[n:n + len(chunk), j] = _ke_float_kolom(sel[:, i])
+    ident[n:n + len(chunk)] = sel[:, pos_identitas]
+    n += len(chunk)
+
+  if header is None:
+    return pd.DataFrame()
+
+  df = pd.DataFrame(values[:n], columns=[header[i] for i in pos_angka], copy=False)
+  for j, i in enumerate(pos_identitas):
+    df.insert(i, header[i], ident[:n, j])
+  if 'kab_kota' in df.columns:
     df['kab_kota'] = df['kab_kota'].fillna('').astype(str)
-  except ValueError as e:
-      # Jika kolom 'kab_kota' tidak ada, baca seperti biasa
+  return df
+
+def _muat_sheet(path, sheet, streaming=None):
+  """Membaca satu sheet: cache Parquet, jika tidak ada dari Excel. Aman dipanggil dari thread lain."""
+  cache_file = _dataset_cache_file(path, sheet)
+  df = _baca_cache(cache_file)
+  if df is not None:
+    return df
+
+  # Workbook besar dibaca secara streaming agar memori puncak tetap kecil
+  if streaming is None:
+    streaming = os.path.getsize(path) >= STREAMING_MIN_BYTES
+  if streaming:
+    df = muat_data_streaming(path, sheet)
+  else:
+    try:
+      # Membaca data
+      df = pd.read_excel(path, sheet_name=sheet, dtype={'kab_kota': str})
+    except ValueError as e:
+      # Jika kolom 'kab_kota' tidak ada, baca seperti biasa (peringatan ditampilkan oleh muat_data)
       if "Unknown column name 'kab_kota'" in str(e):
-          st.warning("Kolom 'kab_kota' tidak ditemukan saat memuat data awal. Pastikan nama kolom benar di Excel.")
-          df = pd.read_excel(path, sheet_name=sheet)
-      else:
-          raise e
+        return pd.read_excel(path, sheet_name=sheet)
+      raise e
+    # Ganti nilai NaN/None pada kolom 'kab_kota' (jika ada)
+    df['kab_kota'] = df['kab_kota'].fillna('').astype(str)
+  _tulis_cache(df, cache_file)
+  return df
+
+# Semua sheet per workbook disimpan di memori proses: {abspath: (hash, {sheet: df | Exception})}
+_sheet_memo = {}
+_sheet_lock = threading.Lock()
+
+def muat_semua_sheet(path, max_workers=None):
+  """
+  Memuat semua sheet workbook secara paralel (thread pool) pada akses pertama.
+  Akses berikutnya (ganti sheet, perbandingan Populasi vs Sampel) langsung dari memori.
+  """
+  key = os.path.abspath(path)
+  workbook_hash = file_hash(path)
+  with _sheet_lock:
+    memo = _sheet_memo.get(key)
+    if memo is not None and memo[0] == workbook_hash:
+      return memo[1]
+
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True)
+    try:
+      sheets = list(wb.sheetnames)
+    finally:
+      wb.close()
+
+    hasil = {}
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(sheets), 1)) as executor:
+      futures = {sheet: executor.submit(_muat_sheet, path, sheet) for sheet in sheets}
+      for sheet, future in futures.items():
+        try:
+          hasil[sheet] = future.result()
+        except Exception as e:
+          # Simpan error per sheet; dilaporkan saat sheet tersebut diminta
+          hasil[sheet] = e
+
+    _sheet_memo[key] = (workbook_hash, hasil)
+    return hasil
+
+def daftar_sheet(path):
+  return list(muat_semua_sheet(path))
+
+def muat_data(path, sheet, streaming=None):
+  try:
+    if streaming is not None:
+      df = _muat_sheet(path, sheet, streaming=streaming)
+    else:
+      semua_sheet = muat_semua_sheet(path)
+      if sheet not in semua_sheet:
+        raise ValueError(f"Sheet '{sheet}' tidak ditemukan. Sheet tersedia: {list(semua_sheet)}")
+      df = semua_sheet[sheet]
+      if isinstance(df, Exception):
+        raise df
+
+    if 'kab_kota' not in df.columns:
+      st.warning("Kolom 'kab_kota' tidak ditemukan saat memuat data awal. Pastikan nama kolom benar di Excel.")
   # Jika gagal membaca file
   except Exception as e:
       st.error(f"Gagal memuat data dari {path} sheet {sheet}: {e}")
@@ -28,6 +231,32 @@ def muat_data(path, sheet):
 
   return df
 
+# Tabel tampilan (identitas tetap teks, kolom lain numerik) disimpan di memori proses per sheet
+_tampilan_memo = {}
+_tampilan_lock = threading.Lock()
+TAMPILAN_MEMO_MAKS = 8
+
+def muat_data_tampilan(path, sheet):
+  """
+  Data untuk halaman Dataset: kolom identitas tetap teks, kolom lain dikonversi ke angka,
+  ditambah jumlah sel yang diimputasi per wilayah. Dihitung sekali per hash workbook.
+  """
+  key = (os.path.abspath(path), sheet, file_hash(path))
+  with _tampilan_lock:
+    if key in _tampilan_memo:
+      return _tampilan_memo[key]
+    df_raw = muat_data(path, sheet)
+    if df_raw.empty:
+      return df_raw, pd.Series(dtype=int)
+    identitas = [c for c in df_raw.columns if c in KOLOM_IDENTITAS]
+    data_num = replace_non_numeric(del_col_non_numeric(df_raw))
+    _, n_imputasi = missing_value(data_num, return_report=True)
+    df_tampil = pd.concat([df_raw[identitas], data_num], axis=1)[list(df_raw.columns)]
+    if len(_tampilan_memo) >= TAMPILAN_MEMO_MAKS:
+      _tampilan_memo.pop(next(iter(_tampilan_memo)))
+    _tampilan_memo[key] = (df_tampil, n_imputasi)
+    return _tampilan_memo[key]
+
 #* 2. Preprocessing
 # Menghapus non-numerik
 def del_col_non_numeric(data):
@@ -43,64 +272,317 @@ def replace_non_numeric(data):
   return data_num
 
 # Mengisi missing value
-def missing_value(data):
+def _isi_blok(arr):
+  """
+  Mengisi NaN pada array (baris x tahun) sekaligus: interpolasi linear di tengah,
+  nilai valid terdekat di depan/belakang (sama dengan interpolate + bfill + ffill).
+  """
+  n_tahun = arr.shape[1]
+  valid = ~np.isnan(arr)
+  posisi = np.arange(n_tahun)
+
+  # Posisi nilai valid sebelumnya / berikutnya untuk setiap sel
+  prev = np.maximum.accumulate(np.where(valid, posisi, -1), axis=1)
+  nxt = np.minimum.accumulate(np.where(valid, posisi, n_tahun)[:, ::-1], axis=1)[:, ::-1]
+  ada_prev = prev >= 0
+  ada_next = nxt < n_tahun
+
+  nilai_prev = np.take_along_axis(arr, np.clip(prev, 0, n_tahun - 1), axis=1)
+  nilai_next = np.take_along_axis(arr, np.clip(nxt, 0, n_tahun - 1), axis=1)
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    bobot = (posisi - prev) / (nxt - prev)
+    tengah = nilai_prev + (nilai_next - nilai_prev) * bobot
+
+  hasil = np.where(ada_prev & ada_next, tengah, np.nan)
+  hasil = np.where(ada_prev & ~ada_next, nilai_prev, hasil)
+  hasil = np.where(~ada_prev & ada_next, nilai_next, hasil)
+  return np.where(valid, arr, hasil)
+
+def missing_value(data, return_report=False):
+  """
+  Imputasi missing value per indikator (kolom INDIKATOR_TAHUN) secara vektor.
+  Data dibentuk ulang menjadi (baris x indikator x tahun) lalu diisi dalam satu langkah.
+  Jika return_report=True, ikut mengembalikan jumlah sel yang diimputasi per wilayah (baris).
+  """
   data_clean = data.copy()
+  n_imputasi = pd.Series(0, index=data.index, name='n_imputasi')
+
   # Cek missing value
-  if data_clean.isnull().sum().sum() > 0:
-    list_indikator = list(set(kolom.split('_')[0] for kolom in data_clean.columns))
-    
-    for indikator in list_indikator:
-      kolom_tiap_tahun = [k for k in data_clean.columns if k.startswith(indikator + '_')]
-      kolom_tiap_tahun = sorted(kolom_tiap_tahun, key=lambda x: int(x.split('_')[1]))
-      data_tiap_tahun = data_clean[kolom_tiap_tahun]
-      # Interpolasi linear untuk missing di tengah
-      data_tiap_tahun = data_tiap_tahun.interpolate(axis=1, method='linear')
-      # Backfill untuk missing di depan
-      data_tiap_tahun = data_tiap_tahun.bfill(axis=1)
-      # Forward fill untuk missing di belakang
-      data_tiap_tahun = data_tiap_tahun.ffill(axis=1)
-
-      data_clean[kolom_tiap_tahun] = data_tiap_tahun
+  if data_clean.isnull().to_numpy().any():
+    # Kelompokkan kolom per indikator, urut berdasarkan tahun
+    kolom_indikator = {}
+    for kolom in data_clean.columns:
+      bagian = str(kolom).split('_')
+      if len(bagian) == 2 and bagian[1].isdigit():
+        kolom_indikator.setdefault(bagian[0], []).append(kolom)
+    kolom_indikator = {
+      indikator: sorted(kolom_tiap_tahun, key=lambda x: int(x.split('_')[1]))
+      for indikator, kolom_tiap_tahun in kolom_indikator.items()
+    }
+
+    # Indikator dengan jumlah tahun yang sama diproses bersama dalam satu array 3D
+    kelompok = {}
+    for kolom_tiap_tahun in kolom_indikator.values():
+      kelompok.setdefault(len(kolom_tiap_tahun), []).append(kolom_tiap_tahun)
+
+    for n_tahun, daftar_kolom in kelompok.items():
+      semua_kolom = [k for kolom_tiap_tahun in daftar_kolom for k in kolom_tiap_tahun]
+      arr = data_clean[semua_kolom].to_numpy(dtype=float)
+      # (baris, indikator, tahun) -> (baris*indikator, tahun)
+      arr_3d = arr.reshape(len(data_clean), len(daftar_kolom), n_tahun)
+      terisi = _isi_blok(arr_3d.reshape(-1, n_tahun)).reshape(arr.shape)
+
+      n_imputasi += (np.isnan(arr) & ~np.isnan(terisi)).sum(axis=1)
+      data_clean[semua_kolom] = terisi
+
+  if return_report:
+    return data_clean, n_imputasi
   return data_clean
 
 # Normalisasi
-def data_normalization(data):
-  data_norm = data.copy()
+class ZScoreScaler:
+  """
+  Z-score per kolom (mean dan std sampel seperti pandas) yang statistiknya disimpan,
+  sehingga data bisa di-transform/inverse-transform ulang dengan referensi yang sama.
+  """
 
-  for col in data_norm.columns:
-    mean = data_norm[col].mean()
-    std = data_norm[col].std()
-    data_norm[col] = (data_norm[col] - mean) / std
-  
+  def __init__(self, dtype=np.float64):
+    self.dtype = np.dtype(dtype)
+    self.columns = []
+    self.mean_ = np.empty(0)
+    self.std_ = np.empty(0)
+
+  def fit(self, data):
+    self.columns = list(data.columns)
+    self.mean_ = data.mean().to_numpy(dtype=float)
+    self.std_ = data.std().to_numpy(dtype=float)
+    return self
+
+  def update_kolom(self, data, columns):
+    """Menghitung ulang statistik hanya untuk kolom tertentu (kolom baru ditambahkan di akhir)."""
+    for col in columns:
+      mean, std = float(data[col].mean()), float(data[col].std())
+      if col in self.columns:
+        i = self.columns.index(col)
+        self.mean_[i], self.std_[i] = mean, std
+      else:
+        self.columns.append(col)
+        self.mean_ = np.append(self.mean_, mean)
+        self.std_ = np.append(self.std_, std)
+    return self
+
+  def _posisi(self, columns):
+    posisi_kolom = {col: i for i, col in enumerate(self.columns)}
+    missing = [col for col in columns if col not in posisi_kolom]
+    if missing:
+      raise KeyError(f"Kolom belum di-fit pada scaler: {missing}")
+    return [posisi_kolom[col] for col in columns]
+
+  def transform(self, data):
+    """Normalisasi semua kolom sekaligus; kolom data boleh subset dari kolom hasil fit."""
+    posisi = self._posisi(data.columns)
+    values = (data.to_numpy(dtype=float) - self.mean_[posisi]) / self.std_[posisi]
+    return pd.DataFrame(values.astype(self.dtype, copy=False), index=data.index, columns=data.columns)
+
+  def inverse_transform(self, data):
+    """Mengembalikan data ternormalisasi (mis. centroid) ke satuan asli (%)."""
+    posisi = self._posisi(data.columns)
+    values = data.to_numpy(dtype=float) * self.std_[posisi] + self.mean_[posisi]
+    return pd.DataFrame(values, index=data.index, columns=data.columns)
+
+  def to_dict(self):
+    return {
+      "dtype": self.dtype.name,
+      "columns": self.columns,
+      "mean": self.mean_.tolist(),
+      "std": self.std_.tolist(),
+    }
+
+  @classmethod
+  def from_dict(cls, state):
+    scaler = cls(dtype=state.get("dtype", "float64"))
+    scaler.columns = list(state["columns"])
+    scaler.mean_ = np.asarray(state["mean"], dtype=float)
+    scaler.std_ = np.asarray(state["std"], dtype=float)
+    return scaler
+
+  def save(self, path):
+    with open(path, "w") as f:
+      json.dump(self.to_dict(), f)
+
+  @classmethod
+  def load(cls, path):
+    with open(path) as f:
+      return cls.from_dict(json.load(f))
+
+def data_normalization(data, scaler=None, dtype=None, return_scaler=False):
+  # Fit scaler baru jika tidak diberikan scaler referensi.
+  # dtype hasil selalu dtype yang diminta (default float64), bukan dtype yang tersimpan di scaler/cache
+  if scaler is None:
+    scaler = ZScoreScaler(dtype=dtype or np.float64).fit(data)
+  else:
+    scaler.dtype = np.dtype(dtype or np.float64)
+  data_norm = scaler.transform(data)
+
+  if return_scaler:
+    return data_norm, scaler
   return data_norm
 
+def muat_scaler_cache(cache_key, columns):
+  scaler_file = cache_path("dataset", f"{cache_key}_scaler.json")
+  if os.path.exists(scaler_file):
+    try:
+      scaler = ZScoreScaler.load(scaler_file)
+      if set(scaler.columns) == set(columns):
+        return scaler
+    except Exception:
+      pass
+  return None
+
+def simpan_scaler_cache(cache_key, scaler):
+  try:
+    scaler.save(cache_path("dataset", f"{cache_key}_scaler.json"))
+  except Exception as e:
+    print(f"[cache] Gagal menyimpan statistik scaler: {e}")
+
 # Bagi data
-def bagi_data(data):
-
-  data_splits = {}
-  tahun_list = list(range(2018, 2025))
-
-  for i in range(len(tahun_list)):
-    for j in range(i, len(tahun_list)):
-      start = tahun_list[i]
-      end = tahun_list[j]
-      rentang = "|".join(str(t) for t in range(start, end + 1))
-      suffix = f"{start}_{end}" if start != end else str(start)
-      
-      # Split kolom berdasarkan rentang tahun
-      data_splits[f"tpt_tpak_{suffix}"] = data.filter(regex=f"^(TPT|TPAK)_({rentang})")
-      # Split untuk masing-masing indikator
-      data_splits[f"tpt_{suffix}"] = data.filter(regex=f"^TPT_({rentang})")
-      data_splits[f"tpak_{suffix}"] = data.filter(regex=f"^TPAK_({rentang})")
-  return data_splits
+# Pola kolom indikator per tahun, mis. TPT_2018 / TPAK_2024
+POLA_KOLOM_TAHUN = re.compile(r"^(TPT|TPAK)_(\d{4})$")
+# Variabel (nama split) -> indikator yang dipakai
+VAR_INDIKATOR = {"tpt_tpak": ("TPT", "TPAK"), "tpt": ("TPT",), "tpak": ("TPAK",)}
+
+def nama_split(var, tahun):
+  """Nama split untuk var + kumpulan tahun: var_2019, var_2018_2020 (berurutan), var_2019+2021+2024 (acak)."""
+  tahun = sorted({int(t) for t in tahun})
+  if len(tahun) == 1:
+    return f"{var}_{tahun[0]}"
+  if tahun == list(range(tahun[0], tahun[-1] + 1)):
+    return f"{var}_{tahun[0]}_{tahun[-1]}"
+  return f"{var}_" + "+".join(str(t) for t in tahun)
+
+def parse_nama_split(nama):
+  """Kebalikan nama_split: mengembalikan (var, [tahun, ...]) atau None jika format tidak dikenali."""
+  # Cek var terpanjang dulu agar 'tpt_tpak_...' tidak terbaca sebagai 'tpt_...'
+  for var in sorted(VAR_INDIKATOR, key=len, reverse=True):
+    if not nama.startswith(var + "_"):
+      continue
+    sisa = nama[len(var) + 1:]
+    try:
+      if "+" in sisa:
+        tahun = [int(t) for t in sisa.split("+")]
+      elif "_" in sisa:
+        start, end = (int(t) for t in sisa.split("_"))
+        tahun = list(range(start, end + 1))
+      else:
+        tahun = [int(sisa)]
+    except ValueError:
+      return None
+    return (var, tahun) if tahun else None
+  return None
+
+class DataSplits(Mapping):
+  """
+  Penyedia split data secara lazy. Matriks ternormalisasi disimpan sekali,
+  split diambil lewat indeks kolom saat diminta (view tanpa copy jika kolomnya
+  berurutan) dan beberapa split terakhir disimpan di LRU kecil.
+  Tetap bisa dipakai seperti dict lama: data_splits["tpt_2018_2020"].
+  """
+
+  def __init__(self, data, scaler=None, cache_size=8):
+    self.index = data.index
+    self.columns = list(data.columns)
+    self.values = data.to_numpy()
+    # Scaler yang dipakai untuk menormalisasi matriks (untuk inverse_transform)
+    self.scaler = scaler
+    self.cache_size = cache_size
+    self._cache = OrderedDict()
+
+    # Posisi kolom per (indikator, tahun), tahun diambil dari data
+    self._posisi = {}
+    for i, col in enumerate(self.columns):
+      match = POLA_KOLOM_TAHUN.match(str(col))
+      if match:
+        self._posisi[(match.group(1), int(match.group(2)))] = i
+    self.tahun = sorted({t for _, t in self._posisi})
+
+  def posisi_kolom(self, var, tahun):
+    """Indeks kolom untuk var + tahun (urutan kolom asli), None jika ada yang tidak tersedia."""
+    if var not in VAR_INDIKATOR or not tahun:
+      return None
+    posisi = []
+    for indikator in VAR_INDIKATOR[var]:
+      for t in sorted({int(t) for t in tahun}):
+        if (indikator, t) not in self._posisi:
+          return None
+        posisi.append(self._posisi[(indikator, t)])
+    return sorted(posisi)
+
+  def select(self, var, tahun):
+    """Mengambil split untuk var dan kumpulan tahun apa pun (tidak harus berurutan)."""
+    return self[nama_split(var, tahun)]
+
+  def __getitem__(self, nama):
+    if nama in self._cache:
+      self._cache.move_to_end(nama)
+      return self._cache[nama]
+
+    parsed = parse_nama_split(nama)
+    posisi = self.posisi_kolom(*parsed) if parsed else None
+    if posisi is None:
+      raise KeyError(nama)
+
+    # Kolom berurutan -> slice (view), selain itu fancy indexing
+    if posisi == list(range(posisi[0], posisi[-1] + 1)):
+      values = self.values[:, posisi[0]:posisi[-1] + 1]
+    else:
+      values = self.values[:, posisi]
+    split = pd.DataFrame(values, index=self.index, columns=[self.columns[i] for i in posisi], copy=False)
+
+    self._cache[nama] = split
+    if len(self._cache) > self.cache_size:
+      self._cache.popitem(last=False)
+    return split
+
+  def __contains__(self, nama):
+    if nama in self._cache:
+      return True
+    parsed = parse_nama_split(nama) if isinstance(nama, str) else None
+    return parsed is not None and self.posisi_kolom(*parsed) is not None
+
+  def __iter__(self):
+    # Semua rentang tahun berurutan, sama seperti bagi_data versi lama
+    for i, start in enumerate(self.tahun):
+      for end in self.tahun[i:]:
+        for var in VAR_INDIKATOR:
+          nama = nama_split(var, range(start, end + 1))
+          if nama in self:
+            yield nama
+
+  def __len__(self):
+    return sum(1 for _ in self)
+
+def daftar_tahun(data):
+  """Daftar tahun (int, urut) dari kolom TPT_YYYY/TPAK_YYYY pada data."""
+  return sorted({int(m.group(2)) for m in (POLA_KOLOM_TAHUN.match(str(c)) for c in data.columns) if m})
+
+def bagi_data(data, scaler=None):
+  return DataSplits(data, scaler=scaler)
 
 # Preprocessing Keseluruhan
-def preprocessing_data(data):
+def preprocessing_data(data, cache_key=None, dtype=None):
   datacol_num = del_col_non_numeric(data)
   data_replace = replace_non_numeric(datacol_num)
   data_clean = missing_value(data_replace)
-  data_norm = data_normalization(data_clean)
-  data_splits = bagi_data(data_norm)
+
+  # Statistik normalisasi disimpan di samping cache dataset (lihat dataset_cache_key)
+  scaler = muat_scaler_cache(cache_key, data_clean.columns) if cache_key else None
+  scaler_baru = scaler is None
+  data_norm, scaler = data_normalization(data_clean, scaler=scaler, dtype=dtype, return_scaler=True)
+  if cache_key and scaler_baru:
+    simpan_scaler_cache(cache_key, scaler)
+
+  data_splits = bagi_data(data_norm, scaler=scaler)
   return datacol_num, data_replace, data_clean, data_norm, data_splits
 
 #* 3. K-Means
@@ -117,9 +599,9 @@ def kmeans_clustering(data, nilai_k):
   return {"labels": labels, "centroids": kmeans.cluster_centers_}
   
 #* 4. DBSCAN
-def dbscan_clustering(data, eps, min_samples):
-    # Menjalankan DBSCAN
-    dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric='manhattan')
+def dbscan_clustering(data, eps, min_samples, metric='manhattan'):
+    # Menjalankan DBSCAN (metric='precomputed' jika data berupa matriks jarak)
+    dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric=metric)
     
     # Mendapatkan label dan point type
     labels = dbscan.fit_predict(data)
@@ -0,0 +1,173 @@
+import threading
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.metrics import pairwise_distances_chunked, silhouette_score, silhouette_samples
+from sklearn.neighbors import NearestNeighbors
+
+from modules.data_processing import dbscan_clustering
+
+# Batas ukuran matriks jarak penuh (N x N). Di atas batas ini jarak dihitung
+# per blok saat dibutuhkan, tanpa menyimpan matriksnya.
+MAX_MATRIX_BYTES = 256 * 1024 ** 2
+
+
+class DistanceCache:
+    """
+    Cache jarak berpasangan untuk satu run clustering.
+    Setiap metrik (manhattan untuk DBSCAN/kNN, euclidean untuk silhouette) dihitung
+    sekali per blok baris ke matriks float32, lalu dipakai ulang lewat metric='precomputed'.
+    """
+
+    def __init__(self, data, dtype=np.float32, max_bytes=MAX_MATRIX_BYTES):
+        self.data = np.asarray(data, dtype=np.float64)
+        self.dtype = np.dtype(dtype)
+        self.max_bytes = max_bytes
+        self._matrix = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getstate__(self):
+        # Lock tidak bisa di-pickle (mis. saat dikirim ke worker process)
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def muat_matriks(self):
+        """True jika matriks N x N muat dalam batas memori."""
+        return len(self) ** 2 * self.dtype.itemsize <= self.max_bytes
+
+    def _blok(self, metric, reduce_func=None):
+        return pairwise_distances_chunked(self.data, metric=metric, reduce_func=reduce_func)
+
+    def matrix(self, metric):
+        """Matriks jarak untuk metrik tertentu, atau None jika terlalu besar."""
+        if not self.muat_matriks:
+            return None
+        with self._lock:
+            if metric not in self._matrix:
+                n = len(self)
+                hasil = np.empty((n, n), dtype=self.dtype)
+                awal = 0
+                for blok in self._blok(metric):
+                    hasil[awal:awal + len(blok)] = blok
+                    awal += len(blok)
+                np.fill_diagonal(hasil, 0)
+                self._matrix[metric] = hasil
+            return self._matrix[metric]
+
+    def kneighbors(self, k, metric='manhattan'):
+        """
+        Jarak k tetangga terdekat tiap titik (titik itu sendiri dihitung), urut naik.
+        Setara NearestNeighbors(n_neighbors=k).kneighbors(data)[0].
+        """
+        k = min(int(k), len(self))
+
+        def _k_terkecil(blok, awal=0):
+            return np.sort(np.partition(blok, k - 1, axis=1)[:, :k], axis=1)
+
+        dist = self.matrix(metric)
+        if dist is not None:
+            return _k_terkecil(dist)
+        return np.vstack(list(self._blok(metric, reduce_func=_k_terkecil)))
+
+    def dbscan(self, eps, min_samples):
+        """dbscan_clustering (manhattan) memakai matriks jarak jika tersedia."""
+        dist = self.matrix('manhattan')
+        if dist is None:
+            return dbscan_clustering(self.data, eps, min_samples)
+        return dbscan_clustering(dist, eps, min_samples, metric='precomputed')
+
+    def _sub(self, metric, mask):
+        dist = self.matrix(metric)
+        if dist is None or mask is None:
+            return dist
+        idx = np.flatnonzero(mask)
+        return dist[np.ix_(idx, idx)]
+
+    def silhouette_score(self, labels, mask=None, metric='euclidean'):
+        """Silhouette score untuk subset baris (mask) atau seluruh data."""
+        dist = self._sub(metric, mask)
+        if dist is None:
+            data = self.data if mask is None else self.data[mask]
+            return silhouette_score(data, labels, metric=metric)
+        return float(silhouette_score(dist, labels, metric='precomputed'))
+
+    def silhouette_samples(self, labels, metric='euclidean'):
+        dist = self.matrix(metric)
+        if dist is None:
+            return silhouette_samples(self.data, labels, metric=metric)
+        return silhouette_samples(dist, labels, metric='precomputed')
+
+
+class DBSCANExtractor:
+    """
+    Ekstraksi ulang DBSCAN (manhattan) untuk sembarang eps <= eps_max tanpa fit ulang.
+    Graf tetangga radius eps_max dibangun sekali per data & MinPts; untuk tiap eps
+    label dan tipe titik diturunkan dari graf itu dalam O(jumlah edge).
+    Hasil identik dengan dbscan_clustering(data, eps, min_samples).
+    """
+
+    def __init__(self, dist, min_samples, eps_max):
+        self.min_samples = int(min_samples)
+        self.eps_max = float(eps_max)
+        matriks = dist.matrix('manhattan')
+        if matriks is not None:
+            nn = NearestNeighbors(radius=self.eps_max, metric='precomputed').fit(matriks)
+            graf = nn.radius_neighbors_graph(matriks, mode='distance')
+        else:
+            nn = NearestNeighbors(radius=self.eps_max, metric='manhattan').fit(dist.data)
+            graf = nn.radius_neighbors_graph(dist.data, mode='distance')
+        # Jarak 0 (titik itu sendiri/duplikat) tetap disimpan sebagai edge eksplisit
+        self.graf = graf.tocsr()
+        self.graf.sort_indices()
+
+    def __len__(self):
+        return self.graf.shape[0]
+
+    def extract(self, eps, min_samples=None):
+        """
+        Label & point type DBSCAN untuk eps tertentu (format sama dengan dbscan_clustering).
+        min_samples boleh berbeda dari saat dibangun; graf yang sama berlaku untuk semua MinPts.
+        """
+        min_samples = self.min_samples if min_samples is None else int(min_samples)
+        if eps > self.eps_max:
+            raise ValueError(f"eps ({eps}) melebihi eps_max ({self.eps_max}).")
+        n = len(self)
+        adj = csr_matrix((self.graf.data <= eps, self.graf.indices, self.graf.indptr), shape=(n, n))
+        adj.eliminate_zeros()
+
+        # Core: jumlah tetangga dalam radius eps (termasuk diri sendiri) >= MinPts
+        core = np.diff(adj.indptr) >= min_samples
+        labels = np.full(n, -1, dtype=np.int64)
+        idx_core = np.flatnonzero(core)
+        if len(idx_core):
+            _, komponen = connected_components(adj[idx_core][:, idx_core], directed=False)
+            # Nomor cluster mengikuti urutan core pertama, sama seperti sklearn
+            _, pertama = np.unique(komponen, return_index=True)
+            urutan = np.empty(len(pertama), dtype=np.int64)
+            urutan[np.argsort(pertama)] = np.arange(len(pertama))
+            labels[idx_core] = urutan[komponen]
+
+            # Border ikut cluster core tetangga dengan nomor terkecil (yang pertama menjangkaunya)
+            idx_lain = np.flatnonzero(~core)
+            ke_core = adj[idx_lain][:, idx_core].tocsr()
+            ada = np.diff(ke_core.indptr) > 0
+            if ada.any():
+                label_tetangga = labels[idx_core][ke_core.indices]
+                labels[idx_lain[ada]] = np.minimum.reduceat(label_tetangga, ke_core.indptr[:-1][ada])
+
+        point_type = np.full(n, "Border", dtype=object)
+        point_type[core] = "Core"
+        point_type[labels == -1] = "Noise"
+        return {
+            "labels": labels,
+            "point_type": point_type.tolist(),
+        }
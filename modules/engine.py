@@ -0,0 +1,550 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import dataclasses
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+from sklearn.neighbors import NearestNeighbors
+from kneed import KneeLocator
+from threadpoolctl import threadpool_limits
+from sklearn.metrics import silhouette_score, davies_bouldin_score
+
+from modules.data_processing import muat_semua_sheet, kmeans_clustering, dbscan_clustering, dataset_cache_key
+from modules.ingest import ingest_dataset
+from modules.distance import DistanceCache, DBSCANExtractor
+from utils.cache import LRUCache, CACHE_DIR
+from utils.memori import catat_memori
+
+# Engine clustering tanpa Streamlit: input -> HasilClustering. Tidak menyentuh
+# st.session_state maupun widget, sehingga bisa dipakai dari worker process,
+# batch job dan benchmark. Halaman Streamlit (modules/analysis.py) hanya membaca hasilnya.
+
+METODE = ("K-Means", "DBSCAN")
+
+# Batas atas slider Epsilon di halaman Clustering (radius graf untuk ekstraksi ulang DBSCAN)
+EPS_MAKS = 10.0
+
+# Cache hasil clustering lintas sesi: memori (LRU) + disk di .cache/hasil
+_hasil_cache = LRUCache(max_bytes=64 * 1024 ** 2, disk_dir=os.path.join(CACHE_DIR, "hasil"))
+HASIL_CACHE_VERSI = 4
+
+
+@contextmanager
+def catat_waktu(waktu, tahap):
+    """
+    Menambahkan durasi blok (time.perf_counter) ke waktu[tahap]; dipanggil berulang akan dijumlahkan.
+    Di dalam utils.memori.ukur_memori, puncak & sisa memori tahap yang sama ikut dicatat.
+    """
+    start = time.perf_counter()
+    try:
+        with catat_memori(tahap):
+            yield
+    finally:
+        waktu[tahap] = waktu.get(tahap, 0.0) + time.perf_counter() - start
+
+
+class LogProses:
+    """Logger tanpa UI (modul logging) dengan antarmuka yang sama seperti status logger halaman."""
+
+    def __init__(self, name=__name__):
+        self._log = logging.getLogger(name)
+
+    def info(self, msg):
+        self._log.info(msg)
+
+    def success(self, msg):
+        self._log.info(msg)
+
+    def warning(self, msg):
+        self._log.warning(msg)
+
+    def error(self, msg):
+        self._log.error(msg)
+
+    def exception(self, e):
+        self._log.exception(e)
+
+
+@dataclass
+class DataAnalisis:
+    """Data yang sudah dipreprocessing untuk satu sheet (dipakai bersama banyak run)."""
+    identitas: pd.DataFrame
+    data_clean: pd.DataFrame
+    data_splits: object
+
+
+@dataclass
+class HasilClustering:
+    """Hasil satu run clustering beserta data pendukung untuk visualisasi."""
+    metode: str
+    labels: np.ndarray
+    point_type: Optional[list] = None
+    silhouette: Optional[float] = None
+    dbi: Optional[float] = None
+    params: dict = field(default_factory=dict)
+    k_search: Optional[pd.DataFrame] = None
+    centroids: Optional[pd.DataFrame] = None
+    minpts_plot_data: Optional[pd.DataFrame] = None
+    elbow_data: Optional[np.ndarray] = None
+    elbow_minpts: Optional[int] = None
+    elbow_knee: tuple = (None, None)
+    sensitivity_data: Optional[pd.DataFrame] = None
+    # Jumlah fitur yang benar-benar di-cluster (setelah PCA jika diterapkan)
+    n_fitur: Optional[int] = None
+    # Nilai silhouette per wilayah (termasuk noise) untuk silhouette plot dan PDF, ikut di-cache
+    silhouette_samples: Optional[np.ndarray] = None
+    # Durasi per tahap (detik): pca, sweep, fit_akhir, evaluasi; cache jika diambil dari cache
+    waktu: dict = field(default_factory=dict)
+    # Pesan untuk pengguna [(level, teks)], level: info/success/warning
+    pesan: list = field(default_factory=list)
+    cache_hit: bool = False
+    # Graf tetangga untuk eksplorasi Epsilon langsung (tidak ikut di-cache)
+    extractor: Optional[DBSCANExtractor] = field(default=None, repr=False)
+
+
+def siapkan_data(path, sheet, df_raw=None, logger=None):
+    """Memuat sheet (tanpa Streamlit) dan menjalankan preprocessing dengan artefak cache."""
+    if df_raw is None:
+        semua_sheet = muat_semua_sheet(path)
+        if sheet not in semua_sheet:
+            raise ValueError(f"Sheet '{sheet}' tidak ditemukan. Sheet tersedia: {list(semua_sheet)}")
+        df_raw = semua_sheet[sheet]
+        if isinstance(df_raw, Exception):
+            raise df_raw
+    for c in ('prov', 'kab_kota'):
+        if c not in df_raw.columns:
+            raise ValueError(f"Kolom '{c}' tidak ditemukan di dataset.")
+
+    _, _, data_clean, _, data_splits = ingest_dataset(path, sheet, df_raw=df_raw, logger=logger)
+    return DataAnalisis(
+        identitas=df_raw[['prov', 'kab_kota']].copy(),
+        data_clean=data_clean,
+        data_splits=data_splits,
+    )
+
+
+def fingerprint_hasil(path, sheet, var, tahun_pilihan, metode, params):
+    """
+    Fingerprint kanonik input run_analysis: hash isi sheet, variabel, rentang tahun,
+    metode dan hanya parameter yang memengaruhi hasil metode tersebut.
+    """
+    if metode == "K-Means":
+        if params.get('optimal_k', False):
+            relevan = {'optimal_k': True, 'k_range': [int(k) for k in params.get('k_range', (2, 6))]}
+        else:
+            relevan = {'optimal_k': False, 'k': int(params.get('k', 2))}
+    else:
+        relevan = {
+            'optimal_dbscan': bool(params.get('optimal_dbscan', False)),
+            'sensitivitas_dbscan': bool(params.get('sensitivitas_dbscan', False)),
+        }
+        if not relevan['optimal_dbscan']:
+            relevan.update({
+                'eps': float(params.get('eps', 0.5)),
+                'minpts': int(params.get('minpts', 5)),
+                'use_pca_manual': bool(params.get('use_pca_manual', False)),
+            })
+    isi = {
+        'versi': HASIL_CACHE_VERSI,
+        'dataset': dataset_cache_key(path, sheet),
+        'var': var,
+        'tahun': [str(t) for t in tahun_pilihan],
+        'metode': metode,
+        'params': relevan,
+    }
+    return hashlib.sha256(json.dumps(isi, sort_keys=True).encode()).hexdigest()
+
+
+def jalankan_dengan_cache(path, sheet, var, tahun_pilihan, metode, params, data_for_clustering,
+                          scaler=None, dist=None, logger=None):
+    """
+    jalankan_clustering dengan cache hasil lintas sesi/proses. Konfigurasi yang sama
+    (dataset, variabel, tahun, metode, parameter) langsung diambil dari cache.
+    Mode eksplorasi Epsilon langsung tetap dihitung karena butuh graf tetangga.
+    """
+    logger = logger or LogProses()
+    waktu = {}
+    with catat_waktu(waktu, 'cache'):
+        kunci = None if params.get('live_eps') else fingerprint_hasil(path, sheet, var, tahun_pilihan, metode, params)
+        cached = _hasil_cache.get(kunci) if kunci else None
+    if cached is not None:
+        logger.info("Hasil clustering untuk konfigurasi ini diambil dari cache.")
+        return dataclasses.replace(cached, cache_hit=True, waktu=waktu)
+
+    hasil = jalankan_clustering(data_for_clustering, metode, params, scaler=scaler, dist=dist, logger=logger)
+    if kunci is not None:
+        _hasil_cache.put(kunci, dataclasses.replace(hasil, extractor=None))
+    return hasil
+
+
+def jalankan_clustering(data_for_clustering, metode, params, scaler=None, dist=None, logger=None):
+    """
+    Menjalankan K-Means atau DBSCAN (termasuk pencarian parameter optimal) dan skor evaluasi
+    pada satu split data ternormalisasi. params tidak diubah; parameter akhir ada di hasil.params.
+    """
+    if metode not in METODE:
+        raise ValueError(f"Metode clustering tidak dikenali: {metode}")
+    logger = logger or LogProses()
+    dist = dist if dist is not None else DistanceCache(data_for_clustering)
+    params = dict(params)
+
+    waktu = {}
+    if metode == "K-Means":
+        hasil = _jalankan_kmeans(data_for_clustering, params, scaler, dist, logger, waktu)
+    else:
+        hasil = _jalankan_dbscan(data_for_clustering, params, dist, logger, waktu)
+
+    with catat_waktu(waktu, 'evaluasi'):
+        logger.info("Menghitung skor evaluasi...")
+        labels = hasil.labels
+        valid_mask = labels != -1
+        valid_labels = labels[valid_mask]
+        if len(np.unique(valid_labels)) > 1:
+            hasil.silhouette = dist.silhouette_score(valid_labels, mask=valid_mask)
+            hasil.dbi = davies_bouldin_score(data_for_clustering[valid_mask], valid_labels)
+            logger.info(f"Skor (Valid Only): Sil = {hasil.silhouette:.4f}, DBI = {hasil.dbi:.4f}")
+        elif len(np.unique(labels)) > 1:
+            logger.warning("Skor tidak dihitung: Hanya ada 1 cluster valid (sisanya noise).")
+        else:
+            logger.warning("Skor tidak dihitung: Kurang dari 2 cluster.")
+        if len(np.unique(labels)) > 1:
+            hasil.silhouette_samples = dist.silhouette_samples(labels)
+    hasil.waktu = waktu
+
+    hasil.params = params
+    return hasil
+
+
+def _jalankan_kmeans(data_for_clustering, params, scaler, dist, logger, waktu):
+    logger.info("Menjalankan K-Means...")
+    pesan = []
+    k_search = None
+    if params.get('optimal_k', False):
+        k_min, k_max = params.get('k_range', (2, 6))
+        k_range = range(int(k_min), int(k_max) + 1)
+        logger.info(f"Mencari K optimal menggunakan Silhouette Score (K={k_min}..{k_max}, paralel)...")
+
+        with catat_waktu(waktu, 'sweep'):
+            k_search, k, best_score, hasil_cluster = cari_k_optimal(data_for_clustering, k_range, dist=dist)
+        params['k'] = k
+        pesan.append(('info', f"K optimal ditemukan: {k} (Silhouette: {best_score:.4f})"))
+        logger.info(f"K optimal ditemukan: {k} (Silhouette: {best_score:.4f})")
+    else:
+        with catat_waktu(waktu, 'fit_akhir'):
+            hasil_cluster = kmeans_clustering(data_for_clustering, params.get('k', 2))
+
+    # Centroid dalam satuan asli (%) memakai statistik scaler yang tersimpan
+    with catat_waktu(waktu, 'fit_akhir'):
+        centroids = pd.DataFrame(hasil_cluster.get('centroids'), columns=data_for_clustering.columns)
+        if scaler is not None:
+            centroids = scaler.inverse_transform(centroids)
+        centroids.index.name = 'Cluster'
+
+    return HasilClustering(
+        metode="K-Means",
+        labels=hasil_cluster.get('labels'),
+        k_search=k_search,
+        centroids=centroids,
+        n_fitur=data_for_clustering.shape[1],
+        pesan=pesan,
+    )
+
+
+def _jalankan_dbscan(data_for_clustering, params, dist, logger, waktu):
+    logger.info("Menjalankan DBSCAN...")
+    pesan = []
+    optimal_dbscan = params.get('optimal_dbscan', False)
+    use_pca_manual = params.get('use_pca_manual', False)
+
+    D = data_for_clustering.shape[1]
+    D_final = D
+    data_to_cluster = data_for_clustering.copy()
+    pca_applied = False
+
+    run_pca = False
+    if optimal_dbscan and D >= 3:
+        run_pca = True
+        logger.info("Mode optimal: PCA akan diterapkan (D>=3).")
+    elif not optimal_dbscan and use_pca_manual and D >= 3:
+        run_pca = True
+        logger.info("Mode manual: PCA akan diterapkan (sesuai pilihan user).")
+    elif not optimal_dbscan and not use_pca_manual:
+        logger.info("Mode manual: PCA TIDAK diterapkan. Clustering pada data dimensi penuh.")
+    else:
+        logger.info(f"Dimensi asli ({D}) < 3. PCA tidak diterapkan.")
+
+    if run_pca:
+        target_variance = 0.95
+        pca = PCA(n_components=target_variance)
+        with catat_waktu(waktu, 'pca'):
+            data_pca = pca.fit_transform(data_to_cluster)
+        n_components_pca = pca.n_components_
+        logger.info(f"PCA mempertahankan {target_variance*100}% informasi. Terbentuk {n_components_pca} komponen.")
+
+        data_to_cluster = pd.DataFrame(
+            data_pca,
+            index=data_for_clustering.index,
+            columns=[f"PC{i+1}" for i in range(n_components_pca)]
+        )
+        D_final = n_components_pca
+        pca_applied = True
+
+    final_eps = 0.5
+    final_minpts = D_final + 1
+    distances_knn = None
+    minpts_plot_data = None
+    dist_cluster = DistanceCache(data_to_cluster) if pca_applied else dist
+
+    if optimal_dbscan:
+        logger.info("Mode Optimal: Menjalankan pencarian Silhouette vs. MinPts...")
+
+        # Pencarian Silhouette vs MinPts
+        search_start = D_final + 1
+        search_end = 21
+        if search_start >= search_end:
+            logger.warning(f"Nilai D+1 ({search_start}) lebih besar dari batas (20). Pencarian MinPts dibatasi.")
+            search_end = search_start + 1
+
+        # MinPts tidak boleh melebihi jumlah data (n_neighbors <= n_samples)
+        min_pts_search_range = range(search_start, max(min(search_end, len(data_to_cluster) + 1), search_start + 1))
+        logger.info(f"Mencari Sil vs MinPts (Range: {list(min_pts_search_range)})...")
+
+        # Satu query kNN untuk MinPts terbesar, dipakai ulang untuk semua kandidat, fallback dan elbow
+        with catat_waktu(waktu, 'sweep'):
+            minpts_plot_data, distances_knn = cari_minpts_optimal(data_to_cluster, min_pts_search_range, dist=dist_cluster)
+        logger.info(f"Hasil Sil vs MinPts: {minpts_plot_data['Silhouette'].tolist()}")
+
+        # Menentukan parameter akhir berdasarkan hasil pencarian
+        if not minpts_plot_data.empty and minpts_plot_data['Silhouette'].max() > -1:
+            best_row = minpts_plot_data.loc[minpts_plot_data['Silhouette'].idxmax()]
+            final_minpts = int(best_row['MinPts'])
+            final_eps = float(best_row['Eps_Found'])
+
+            teks = f"Optimal: Epsilon={final_eps:.2f}, MinPts={final_minpts} (Sil={best_row['Silhouette']:.4f})"
+            pesan.append(('success', teks))
+            logger.success(teks)
+        else:
+            logger.warning("Pencarian Sil vs MinPts gagal, fallback ke D+1.")
+            final_minpts = max(2, D_final + 1)
+            # Coba cari Epsilon untuk D+1 (fallback)
+            with catat_waktu(waktu, 'sweep'):
+                if final_minpts > distances_knn.shape[1]:
+                    distances_knn = k_distance_matrix(data_to_cluster, final_minpts, dist=dist_cluster)
+                final_eps = cari_eps_knee(k_distance(distances_knn, final_minpts))
+            pesan.append(('warning', f"Fallback: Epsilon={final_eps:.2f}, MinPts={final_minpts}"))
+
+        params['eps'] = final_eps
+        params['minpts'] = final_minpts
+    else:
+        # Mode Manual: Ambil dari slider
+        logger.info("Mode Manual: Menggunakan parameter dari slider.")
+        final_eps = params.get('eps', 0.5)
+        final_minpts = params.get('minpts', 5)
+        logger.info(f"Parameter manual: MinPts = {final_minpts}, Epsilon = {final_eps}")
+
+    # Elbow Plot (K-distance)
+    logger.info(f"Membuat Elbow Plot data (menggunakan MinPts={final_minpts})...")
+    with catat_waktu(waktu, 'sweep'):
+        if distances_knn is None or final_minpts > distances_knn.shape[1]:
+            distances_knn = k_distance_matrix(data_to_cluster, final_minpts, dist=dist_cluster)
+        elbow_data = k_distance(distances_knn, final_minpts)
+
+        try:
+            kneedle_elbow = KneeLocator(np.arange(len(elbow_data)), elbow_data, curve='convex', direction='increasing', S=1.0)
+            elbow_knee = (kneedle_elbow.elbow, kneedle_elbow.elbow_y)
+            if optimal_dbscan:
+                logger.info(f"Verifikasi Siku: Eps dari plot (={kneedle_elbow.elbow_y:.2f}) vs Eps terpilih (={final_eps:.2f})")
+        except Exception:
+            elbow_knee = (None, None)
+
+    sensitivity_data = None
+    if params.get('sensitivitas_dbscan'):
+        logger.info("Menghitung grid sensitivitas Epsilon x MinPts...")
+        with catat_waktu(waktu, 'sensitivitas'):
+            sensitivity_data = sensitivitas_dbscan(dist_cluster)
+
+    logger.info(f"Menjalankan Clustering DBSCAN final dengan Eps={final_eps}, MinPts={final_minpts}")
+    extractor = None
+    with catat_waktu(waktu, 'fit_akhir'):
+        if params.get('live_eps') and not optimal_dbscan and final_eps <= EPS_MAKS:
+            # Graf radius EPS_MAKS disimpan agar perubahan slider Epsilon cukup diekstraksi ulang
+            extractor = DBSCANExtractor(dist_cluster, final_minpts, EPS_MAKS)
+            hasil_cluster = extractor.extract(final_eps)
+        else:
+            hasil_cluster = dist_cluster.dbscan(final_eps, final_minpts)
+
+    return HasilClustering(
+        metode="DBSCAN",
+        labels=hasil_cluster.get('labels'),
+        point_type=hasil_cluster.get('point_type', None),
+        minpts_plot_data=minpts_plot_data,
+        elbow_data=elbow_data,
+        elbow_minpts=final_minpts,
+        elbow_knee=elbow_knee,
+        sensitivity_data=sensitivity_data,
+        n_fitur=D_final,
+        pesan=pesan,
+        extractor=extractor,
+    )
+
+
+def _fit_kmeans_dan_skor(data, k, dist=None):
+    """Fit K-Means untuk satu nilai K dan hitung Silhouette-nya (-1 jika gagal)."""
+    hasil = kmeans_clustering(data, k)
+    labels = hasil.get('labels') if hasil else None
+    sil = -1
+    if labels is not None and len(np.unique(labels)) > 1:
+        sil = dist.silhouette_score(labels) if dist is not None else silhouette_score(data, labels)
+    return k, sil, hasil
+
+
+def cari_k_optimal(data, k_range=range(2, 7), max_workers=None, dist=None):
+    """
+    Mencari K optimal (Silhouette tertinggi) dengan menjalankan semua kandidat K
+    secara paralel di thread pool. Model K terbaik dipakai langsung tanpa fit ulang.
+    Jika dist (DistanceCache) diberikan, Silhouette memakai matriks jarak bersama.
+    Mengembalikan (df_k_search, best_k, best_score, hasil_cluster_terbaik).
+    """
+    # K harus < jumlah data agar Silhouette bisa dihitung
+    k_range = [k for k in k_range if 2 <= k < len(data)]
+    if not k_range:
+        raise ValueError(f"Jumlah data ({len(data)}) terlalu sedikit untuk pencarian K.")
+    n_workers = max(max_workers or min(len(k_range), os.cpu_count() or 1), 1)
+    # KMeans juga memakai thread OpenMP/BLAS; dengan beberapa worker tiap fit dibatasi satu thread
+    # agar jumlah thread tidak melebihi CPU
+    with threadpool_limits(limits=1 if n_workers > 1 else None):
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            hasil_sweep = list(executor.map(lambda k: _fit_kmeans_dan_skor(data, k, dist), k_range))
+
+    # Sama seperti loop berurutan: K terkecil menang jika skornya seri
+    best_k, best_score, best_hasil = k_range[0], -1, hasil_sweep[0][2]
+    for k_test, sil, hasil in hasil_sweep:
+        if sil > best_score:
+            best_k, best_score, best_hasil = k_test, sil, hasil
+
+    df_k_search = pd.DataFrame({
+        'Jumlah K': [k_test for k_test, _, _ in hasil_sweep],
+        'Silhouette': [sil for _, sil, _ in hasil_sweep]
+    })
+    return df_k_search, best_k, best_score, best_hasil
+
+
+def k_distance_matrix(data, k_max, dist=None):
+    """
+    Satu query kNN (Manhattan) untuk k terbesar yang dibutuhkan.
+    Kolom ke-(m-1) adalah jarak ke tetangga ke-m (titik itu sendiri dihitung),
+    sama dengan distances[:, -1] dari NearestNeighbors(n_neighbors=m).
+    """
+    if dist is not None:
+        return dist.kneighbors(k_max, metric='manhattan')
+    k_max = min(int(k_max), len(data))
+    nn = NearestNeighbors(n_neighbors=k_max, metric='manhattan').fit(data)
+    distances, _ = nn.kneighbors(data)
+    return distances
+
+
+def k_distance(distances, minpts):
+    """Kurva k-distance terurut untuk satu MinPts, diambil dari hasil k_distance_matrix."""
+    return np.sort(distances[:, minpts - 1], axis=0)
+
+
+def cari_eps_knee(k_distances, fallback=0.5):
+    """Epsilon dari titik siku (knee) kurva k-distance; fallback jika tidak ditemukan."""
+    try:
+        kneedle = KneeLocator(np.arange(len(k_distances)), k_distances, curve='convex', direction='increasing', S=1.0)
+        eps = kneedle.elbow_y
+        if eps is None or eps <= 0:
+            eps = fallback
+    except Exception:
+        eps = fallback
+    return eps
+
+
+def cari_minpts_optimal(data, minpts_range, dist=None):
+    """
+    Pencarian Silhouette vs MinPts untuk DBSCAN. Jarak kNN dihitung sekali untuk
+    MinPts terbesar lalu diiris per kandidat. Jika dist (DistanceCache) diberikan,
+    kNN, DBSCAN dan Silhouette memakai matriks jarak bersama.
+    Mengembalikan (df_sil_results, distances).
+    """
+    minpts_range = list(minpts_range)
+    distances = k_distance_matrix(data, max(minpts_range), dist=dist)
+
+    sil_scores_for_minpts = []
+    eps_values_for_minpts = []
+    for mp_test in minpts_range:
+        eps_mp = cari_eps_knee(k_distance(distances, mp_test))
+
+        if dist is not None:
+            dbscan_mp = dist.dbscan(eps_mp, mp_test)
+        else:
+            dbscan_mp = dbscan_clustering(data, eps_mp, mp_test)
+        labels_mp = dbscan_mp.get('labels')
+
+        score_mp = -1
+        if labels_mp is not None:
+            valid_mask = labels_mp != -1
+            valid_labels = labels_mp[valid_mask]
+            if len(np.unique(valid_labels)) > 1:
+                if dist is not None:
+                    score_mp = dist.silhouette_score(valid_labels, mask=valid_mask)
+                else:
+                    score_mp = silhouette_score(data[valid_mask], valid_labels)
+
+        sil_scores_for_minpts.append(score_mp)
+        eps_values_for_minpts.append(eps_mp)
+
+    df_sil_results = pd.DataFrame({
+        'MinPts': minpts_range,
+        'Silhouette': sil_scores_for_minpts,
+        'Eps_Found': eps_values_for_minpts
+    })
+    return df_sil_results, distances
+
+
+def sensitivitas_dbscan(dist, minpts_range=range(2, 21), n_eps=50, max_workers=None):
+    """
+    Grid sensitivitas DBSCAN (Epsilon x MinPts): Silhouette (tanpa noise), jumlah cluster
+    dan rasio noise. Satu graf radius untuk Epsilon terbesar dipakai bersama oleh semua sel,
+    setiap MinPts dievaluasi paralel. Rentang Epsilon diambil dari kurva k-distance data.
+    Mengembalikan DataFrame panjang: MinPts, Epsilon, Silhouette, Jumlah Cluster, Rasio Noise.
+    """
+    minpts_range = [mp for mp in minpts_range if 2 <= mp <= len(dist)]
+    if not minpts_range:
+        raise ValueError(f"Jumlah data ({len(dist)}) terlalu sedikit untuk grid sensitivitas.")
+
+    # Dari jarak tetangga terdekat (MinPts terkecil) sampai hampir semua titik menjadi core (MinPts terbesar)
+    knn = dist.kneighbors(max(minpts_range), metric='manhattan')
+    eps_min = max(float(np.percentile(knn[:, min(minpts_range) - 1], 5)), 1e-3)
+    eps_max = max(float(np.percentile(knn[:, -1], 99)), eps_min * 2)
+    eps_grid = np.linspace(eps_min, eps_max, n_eps)
+    extractor = DBSCANExtractor(dist, min(minpts_range), eps_grid[-1])
+
+    def _satu_minpts(mp):
+        baris = []
+        for eps in eps_grid:
+            labels = extractor.extract(eps, mp)['labels']
+            valid_mask = labels != -1
+            n_cluster = len(np.unique(labels[valid_mask]))
+            sil = np.nan
+            if n_cluster > 1:
+                sil = dist.silhouette_score(labels[valid_mask], mask=valid_mask)
+            baris.append((mp, float(eps), sil, n_cluster, float(1 - valid_mask.mean())))
+        return baris
+
+    n_workers = max_workers or min(len(minpts_range), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(n_workers, 1)) as executor:
+        hasil = list(executor.map(_satu_minpts, minpts_range))
+
+    return pd.DataFrame(
+        [baris for per_minpts in hasil for baris in per_minpts],
+        columns=['MinPts', 'Epsilon', 'Silhouette', 'Jumlah Cluster', 'Rasio Noise'],
+    )
@@ -0,0 +1,411 @@
+"""
+Layer peta kab/kota: memuat GeoJSON dan menggabungkan label cluster ke poligonnya.
+
+GeoJSON dibaca sekali lalu disimpan sebagai GeoParquet di .cache/geo (beserta kolom
+orig_name, norm_name, join_name dan prov_g), dikunci dengan hash isi file. Setelah itu
+setiap proses hanya membaca GeoParquet sekali dan run berikutnya mengambilnya dari memori.
+
+Pencocokan wilayah data ke poligon juga hanya dibangun sekali per (GeoJSON, daftar
+wilayah data) dan disimpan sebagai indeks join (baris data tiap baris peta). Mewarnai
+peta cukup menyebar vektor label lewat indeks itu, tanpa merge per run.
+
+Membangun cache sebelum deployment (opsional, otomatis saat run pertama), sekaligus
+melaporkan wilayah yang tidak cocok:
+    python -m modules.geo
+    python -m modules.geo --dataset DATASET.xlsx --sheet Populasi Sampel
+"""
+import os
+import sys
+import time
+import pickle
+import hashlib
+import argparse
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+from modules.engine import catat_waktu, LogProses
+from utils.cache import file_hash, cache_path, safe_name
+
+GEOJSON_PATH = r'geojson/38 Provinsi Indonesia - Kabupaten.json'
+GEO_CACHE_VERSI = 2
+
+# GeoDataFrame siap merge per (path, hash isi file), dipakai bersama semua sesi
+_geo_memo = {}
+GEO_MEMO_MAKS = 8
+
+# IndeksJoin per (hash GeoJSON, hash wilayah data), beserta GeoDataFrame dasarnya
+_join_memo = {}
+JOIN_MEMO_MAKS = 16
+
+
+def buat_gdf_peta(df_hasil, logger, waktu=None, geojson_path=None):
+    """
+    Memuat GeoJSON dan menggabungkan kolom Cluster dari tabel hasil ke wilayah peta.
+    Mengembalikan GeoDataFrame hasil merge, atau None jika kolom nama wilayah tidak terdeteksi.
+    waktu: dict opsional untuk mencatat durasi tahap 'geo' dan 'merge'.
+    geojson_path: layer poligon lain (mis. poligon sintetis dari modules/sintetis.py).
+    """
+    waktu = {} if waktu is None else waktu
+    with catat_waktu(waktu, 'geo'):
+        gdf = _muat_geojson(logger, geojson_path)
+    if gdf is None:
+        return None
+    with catat_waktu(waktu, 'merge'):
+        indeks = _indeks_join(gdf, geojson_path or GEOJSON_PATH, df_hasil, logger)
+        _laporkan_join(indeks, logger)
+        return warnai_peta(indeks, df_hasil['Cluster'])
+
+
+def _muat_geojson(logger, geojson_path=None):
+    """GeoJSON kab/kota dengan kolom nama & provinsi ternormalisasi, atau None jika kolom nama tidak terdeteksi."""
+    geojson_path = geojson_path or GEOJSON_PATH
+    if not os.path.exists(geojson_path):
+        raise FileNotFoundError(f"GeoJSON tidak ditemukan. Letakkan file GeoJSON di: {geojson_path}")
+
+    kunci = (os.path.abspath(geojson_path), file_hash(geojson_path))
+    gdf = _geo_memo.get(kunci)
+    if gdf is not None:
+        logger.info("GeoJSON diambil dari cache.")
+        return gdf
+
+    logger.info("Memuat GeoJSON...")
+    gdf = _muat_geo_cache(geojson_path, logger)
+    if gdf is None:
+        return None
+    if len(_geo_memo) >= GEO_MEMO_MAKS:
+        _geo_memo.pop(next(iter(_geo_memo)))
+    _geo_memo[kunci] = gdf
+    return gdf
+
+
+def geo_cache_file(geojson_path):
+    """File GeoParquet hasil siapkan_geojson, dikunci dengan hash isi GeoJSON."""
+    nama = os.path.splitext(os.path.basename(geojson_path))[0]
+    return cache_path("geo", f"{safe_name(nama)}_{file_hash(geojson_path)[:16]}_v{GEO_CACHE_VERSI}.parquet")
+
+
+def _muat_geo_cache(geojson_path, logger):
+    """GeoDataFrame siap merge dari GeoParquet; dibangun (dan disimpan) dari GeoJSON jika belum ada."""
+    cache_file = geo_cache_file(geojson_path)
+    if os.path.exists(cache_file):
+        try:
+            return gpd.read_parquet(cache_file)
+        except Exception as e:
+            logger.warning(f"Cache GeoParquet tidak terbaca ({e}), dibangun ulang dari GeoJSON.")
+
+    gdf = siapkan_geojson(geojson_path, logger)
+    if gdf is not None:
+        try:
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            gdf.to_parquet(tmp_file, index=False)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.warning(f"Gagal menyimpan cache GeoParquet: {e}")
+    return gdf
+
+
+def siapkan_geojson(geojson_path, logger):
+    """Membaca GeoJSON dan menambahkan orig_name, norm_name, join_name dan prov_g (None jika kolom nama tidak terdeteksi)."""
+    gdf = gpd.read_file(geojson_path)
+
+    NAMA_KAB_KOTA = _detect_name_column(gdf)
+    if NAMA_KAB_KOTA is None:
+        logger.error("Tidak dapat mendeteksi kolom nama wilayah di GeoJSON. Kolom yang biasa: WADMKK, NAME_2, NAMA, dsb.")
+        return None
+
+    gdf['orig_name'] = gdf[NAMA_KAB_KOTA].astype(str)
+
+    gdf['norm_name'] = _normalize_name_series(gdf['orig_name'])
+    gdf['join_name'] = _make_join_key(gdf['norm_name'])
+
+    PROV_COL = _detect_prov_column(gdf)
+    if PROV_COL:
+        gdf['prov_g'] = _normalize_name_series(gdf[PROV_COL].astype(str))
+    else:
+        gdf['prov_g'] = ""
+    return gdf
+
+
+@dataclass
+class IndeksJoin:
+    """
+    Hasil join nama wilayah GeoJSON x data (left join, satu baris peta per pasangan).
+    geo_pos: baris GeoJSON tiap baris peta; data_pos: baris data tiap baris peta (-1 jika tidak cocok).
+    kolom_data: kolom dari sisi data (prov_d, orig_name_df, display_name, prov) tiap baris peta.
+    saran: kandidat nama peta untuk wilayah data yang tidak cocok (lihat modules/alias.py).
+    gdf_dasar hanya ada di memori (tidak disimpan ke disk).
+    """
+    geo_pos: np.ndarray
+    data_pos: np.ndarray
+    kolom_data: pd.DataFrame
+    tidak_cocok_geo: list
+    tidak_cocok_data: list
+    saran: pd.DataFrame
+    gdf_dasar: Optional[gpd.GeoDataFrame] = None
+
+
+def _kunci_identitas(df):
+    """Hash kolom prov & kab_kota: indeks join yang sama dipakai untuk data dengan wilayah yang sama."""
+    kolom = [c for c in ('prov', 'kab_kota') if c in df.columns]
+    nilai = pd.util.hash_pandas_object(df[kolom].astype(str), index=False).to_numpy()
+    return hashlib.sha256(nilai.tobytes() + "|".join(kolom).encode()).hexdigest()
+
+
+def join_cache_file(geojson_path, kunci_identitas, kunci_alias=""):
+    nama = f"join_{file_hash(geojson_path)[:16]}_{kunci_identitas[:16]}"
+    if kunci_alias:
+        nama += f"_{kunci_alias[:8]}"
+    return cache_path("geo", f"{nama}_v{GEO_CACHE_VERSI}.pkl")
+
+
+def indeks_join(df, logger, geojson_path=None):
+    """IndeksJoin (dengan gdf_dasar) untuk wilayah pada df, atau None jika kolom nama GeoJSON tidak terdeteksi."""
+    gdf = _muat_geojson(logger, geojson_path)
+    if gdf is None:
+        return None
+    return _indeks_join(gdf, geojson_path or GEOJSON_PATH, df, logger)
+
+
+def _indeks_join(gdf, geojson_path, df, logger):
+    """
+    Indeks join dari memori, lalu disk (.cache/geo), dan dibangun sekali jika belum ada.
+    Tabel alias ikut menjadi kunci, sehingga alias baru langsung membangun ulang indeks.
+    """
+    from modules.alias import kunci_alias
+
+    kunci_identitas, alias = _kunci_identitas(df), kunci_alias()
+    kunci = (file_hash(geojson_path), kunci_identitas, alias)
+    indeks = _join_memo.get(kunci)
+    if indeks is not None:
+        return indeks
+
+    cache_file = join_cache_file(geojson_path, kunci_identitas, alias)
+    try:
+        with open(cache_file, "rb") as f:
+            indeks = pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Indeks join tidak terbaca ({e}), dibangun ulang.")
+    if indeks is None:
+        indeks = bangun_indeks_join(gdf, df, logger, kunci_geo=kunci[0])
+        try:
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                pickle.dump(indeks, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.warning(f"Gagal menyimpan indeks join: {e}")
+
+    indeks.gdf_dasar = _gdf_dasar(gdf, indeks)
+    if len(_join_memo) >= JOIN_MEMO_MAKS:
+        _join_memo.pop(next(iter(_join_memo)))
+    _join_memo[kunci] = indeks
+    return indeks
+
+
+def _teks_terisi(s):
+    return s.map(lambda v: isinstance(v, str) and v.strip() != "").astype(bool)
+
+
+def bangun_indeks_join(gdf, df, logger, kunci_geo=None):
+    """
+    Mencocokkan wilayah GeoJSON dengan baris data berdasarkan join key nama kab/kota
+    (left join seperti merge peta sebelumnya: nama ganda di data menggandakan baris peta).
+    Nama di tabel alias diarahkan ke nama petanya; sisanya yang tidak cocok diberi saran.
+    """
+    from modules.alias import muat_alias, terapkan_alias, pencocok_untuk
+
+    logger.info("Membangun indeks join wilayah peta...")
+    kab_kota = df['kab_kota']
+    valid = (
+        kab_kota.notna() &
+        (kab_kota.astype(str).str.lower() != 'none') &
+        (kab_kota.astype(str).str.strip() != '')
+    ).to_numpy()
+    data = pd.DataFrame({'orig_name_df': kab_kota[valid].astype(str).to_numpy()}, index=np.flatnonzero(valid))
+    data['join_name'] = _make_join_key(_normalize_name_series(data['orig_name_df'])).to_numpy()
+    if 'prov' in df.columns:
+        data['prov_d'] = _normalize_name_series(df['prov'][valid].astype(str)).to_numpy()
+    else:
+        data['prov_d'] = ""
+    data['join_name'] = terapkan_alias(data['join_name'], data['prov_d'], muat_alias()).to_numpy()
+    if data['join_name'].duplicated().any():
+        logger.warning("Nama wilayah ganda di data; wilayah peta dengan nama tersebut digandakan.")
+
+    pasangan = pd.DataFrame({'join_name': gdf['join_name'].to_numpy(), 'geo_pos': np.arange(len(gdf))}).merge(
+        data[['join_name']].rename_axis('data_pos').reset_index(), on='join_name', how='left',
+    )
+    geo_pos = pasangan['geo_pos'].to_numpy()
+    data_pos = pasangan['data_pos'].fillna(-1).to_numpy(dtype=np.int64)
+
+    kolom_data = data[['prov_d', 'orig_name_df']].reindex(data_pos).reset_index(drop=True)
+    orig_name = gdf['orig_name'].take(geo_pos).reset_index(drop=True)
+    prov_g = gdf['prov_g'].take(geo_pos).reset_index(drop=True)
+    kolom_data['display_name'] = orig_name.fillna(kolom_data['orig_name_df'])
+    prov = pd.Series("", index=kolom_data.index, dtype=object)
+    prov[_teks_terisi(prov_g)] = prov_g
+    prov[_teks_terisi(kolom_data['prov_d'])] = kolom_data['prov_d']
+    kolom_data['prov'] = prov.fillna("").astype(str)
+
+    cocok = np.zeros(len(df), dtype=bool)
+    cocok[data_pos[data_pos >= 0]] = True
+    tanpa_peta = valid & ~cocok
+    saran = pencocok_untuk(gdf, kunci_geo).sarankan(
+        kab_kota[tanpa_peta].astype(str),
+        df['prov'][tanpa_peta] if 'prov' in df.columns else [""] * int(tanpa_peta.sum()),
+    )
+    return IndeksJoin(
+        geo_pos=geo_pos,
+        data_pos=data_pos,
+        kolom_data=kolom_data,
+        tidak_cocok_geo=gdf['orig_name'].take(geo_pos[data_pos < 0]).tolist(),
+        tidak_cocok_data=kab_kota[tanpa_peta].astype(str).tolist(),
+        saran=saran,
+    )
+
+
+def _gdf_dasar(gdf, indeks):
+    """GeoDataFrame peta tanpa label: kolom sama dengan hasil merge, Cluster masih kosong."""
+    dasar = gdf.take(indeks.geo_pos).reset_index(drop=True)
+    dasar['Cluster'] = np.nan
+    dasar[['prov_d', 'orig_name_df']] = indeks.kolom_data[['prov_d', 'orig_name_df']]
+    dasar['display_name'] = indeks.kolom_data['display_name']
+    dasar['prov'] = indeks.kolom_data['prov']
+    return dasar
+
+
+def label_peta(data_pos, labels):
+    """Label cluster sejajar baris peta dari label per baris data (NaN untuk wilayah tidak cocok)."""
+    labels = np.asarray(labels)
+    cocok = data_pos >= 0
+    if cocok.all():
+        # Tipe sama dengan hasil merge: tipe label asli jika semua wilayah cocok
+        return labels[data_pos]
+    hasil = np.full(len(data_pos), np.nan)
+    hasil[cocok] = labels[data_pos[cocok]]
+    return hasil
+
+
+def warnai_peta(indeks, labels):
+    """GeoDataFrame peta dengan kolom Cluster dari label per baris data (tanpa merge ulang)."""
+    gdf = indeks.gdf_dasar.copy()
+    gdf['Cluster'] = label_peta(indeks.data_pos, labels)
+    return gdf
+
+
+def _laporkan_join(indeks, logger):
+    n_total = len(indeks.data_pos)
+    n_matched = int((indeks.data_pos >= 0).sum())
+    if indeks.tidak_cocok_geo:
+        contoh = ", ".join(indeks.tidak_cocok_geo[:10])
+        logger.warning(f"{len(indeks.tidak_cocok_geo)} wilayah di peta tidak cocok dengan data: {contoh}"
+                       f"{' ...' if len(indeks.tidak_cocok_geo) > 10 else ''}")
+    if indeks.tidak_cocok_data:
+        logger.warning(f"{len(indeks.tidak_cocok_data)} wilayah di data tidak ada di peta "
+                       f"({indeks.saran['nama_data'].nunique()} punya saran alias).")
+    logger.success(f"Wilayah yang berhasil dicocokkan: {n_matched-1}/{n_total-1}")
+
+
+def _detect_name_column(gdf: gpd.GeoDataFrame, candidates: Optional[list] = None) -> Optional[str]:
+    """
+    Try to detect the column in gdf that contains the district/kabupaten/kota name.
+    Returns the column name or None if not found.
+    """
+    if candidates is None:
+        candidates = [
+            "WADMKK", "WADMKKK", "WADMKK_", "NAME_2", "NAME_1", "NAMA_KAB", "NAMA", "NM_KAB",
+            "nm_kab", "KABUPATEN", "KAB", "KAB_KOTA", "KABKOTA", "KOTA", "KABKOT", "kab_kota",
+            "KAB_CODE", "KAB_KODE", "NM_KEC", "KAB_NAMA", "district", "district_name"
+        ]
+    for c in candidates:
+        if c in gdf.columns:
+            return c
+    for col in gdf.columns:
+        col_l = col.lower()
+        if ("kab" in col_l) or ("kota" in col_l) or ("name" in col_l) or ("nama" in col_l) or ("district" in col_l):
+            return col
+    return None
+
+
+def _detect_prov_column(gdf: gpd.GeoDataFrame) -> Optional[str]:
+    """
+    Detect column containing province name if exists.
+    """
+    for col in gdf.columns:
+        col_l = col.lower()
+        if ("prov" in col_l) or ("provinsi" in col_l) or ("province" in col_l) or ("prov_name" in col_l) or ("wadmpr" in col_l):
+            return col
+    return None
+
+
+def _normalize_name_series(s: pd.Series) -> pd.Series:
+    """
+    Normalize names:
+    - uppercase, strip
+    - replace 'KABUPATEN ' -> 'KAB. ' and 'KEPULAUAN ' -> 'KEP. '
+    - replace adm / adm. / ADM / ADM. -> ADMINISTRASI
+    - remove duplicate spaces
+    Returns normalized series (still containing spaces).
+    """
+    s = s.astype(str).fillna("").str.upper().str.strip()
+    s = s.str.replace("KABUPATEN ", "KAB. ", regex=False)
+    s = s.str.replace("KEPULAUAN ", "KEP. ", regex=False)
+    s = s.str.replace(r"\bADM\.?\b", "ADMINISTRASI", regex=True)
+    s = s.str.replace(r"\s+", " ", regex=True)
+    return s
+
+
+def _make_join_key(s: pd.Series) -> pd.Series:
+    """
+    Create a join key by removing spaces and non-word characters so both sides can be merged.
+    This "joined" key is used for matching; we keep the original display name for tooltips.
+    """
+    key = s.astype(str).fillna("").str.upper()
+    key = key.str.replace(r"[^\w]", "", regex=True)
+    key = key.str.strip()
+    return key
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Membangun cache GeoParquet dan indeks join wilayah untuk halaman Clustering.")
+    parser.add_argument("--geojson", nargs="+", default=[GEOJSON_PATH], help="File GeoJSON (default: GeoJSON bawaan)")
+    parser.add_argument("--dataset", default="DATASET.xlsx", help="File Excel dataset untuk indeks join (kosongkan untuk melewati)")
+    parser.add_argument("--sheet", nargs="+", default=None, help="Nama sheet (default: semua sheet)")
+    args = parser.parse_args(argv)
+
+    from modules.data_processing import daftar_sheet
+    from modules.engine import siapkan_data
+    from modules.alias import kunci_alias
+
+    logger = LogProses()
+    for geojson_path in args.geojson:
+        start = time.perf_counter()
+        gdf = siapkan_geojson(geojson_path, logger)
+        if gdf is None:
+            print(f"{geojson_path}: kolom nama wilayah tidak terdeteksi", file=sys.stderr)
+            continue
+        cache_file = geo_cache_file(geojson_path)
+        gdf.to_parquet(cache_file, index=False)
+        print(f"{geojson_path}: {len(gdf)} wilayah -> {cache_file} ({time.perf_counter() - start:.2f} s)", file=sys.stderr)
+
+        if not args.dataset:
+            continue
+        for sheet in args.sheet or daftar_sheet(args.dataset):
+            identitas = siapkan_data(args.dataset, sheet).identitas.reset_index(drop=True)
+            indeks = indeks_join(identitas, logger, geojson_path)
+            n_cocok = int((indeks.data_pos >= 0).sum())
+            print(f"  {sheet}: {n_cocok}/{len(indeks.data_pos)} baris peta cocok "
+                  f"-> {join_cache_file(geojson_path, _kunci_identitas(identitas), kunci_alias())}", file=sys.stderr)
+            for nama in indeks.tidak_cocok_geo:
+                print(f"    peta tanpa data: {nama}", file=sys.stderr)
+            for nama in indeks.tidak_cocok_data:
+                print(f"    data tanpa peta: {nama}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from modules.data_processing import (
+    muat_data, dataset_cache_key, del_col_non_numeric, replace_non_numeric,
+    missing_value, data_normalization, bagi_data, preprocessing_data,
+    muat_scaler_cache, simpan_scaler_cache, POLA_KOLOM_TAHUN,
+)
+from utils.cache import cache_path, safe_name
+
+# Artefak preprocessing (data_replace & data_clean) disimpan per cache key dataset.
+# Manifest per (path, sheet) mencatat cache key terakhir, sehingga saat BPS merilis
+# pasangan kolom TPT_YYYY/TPAK_YYYY baru hanya bagian yang terdampak yang dihitung ulang.
+
+
+def _manifest_file(path, sheet):
+    return cache_path("ingest", f"{safe_name(os.path.abspath(path))}__{safe_name(sheet)}.json")
+
+
+def _artefak_file(cache_key, nama):
+    return cache_path("ingest", f"{cache_key}_{nama}.parquet")
+
+
+def _baca_manifest(path, sheet):
+    try:
+        with open(_manifest_file(path, sheet)) as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _baca_artefak(cache_key):
+    """Membaca (data_replace, data_clean) yang tersimpan, atau None jika belum ada/rusak."""
+    try:
+        data_replace = pd.read_parquet(_artefak_file(cache_key, "replace"))
+        data_clean = pd.read_parquet(_artefak_file(cache_key, "clean"))
+        return data_replace, data_clean
+    except Exception:
+        return None
+
+
+def _simpan_artefak(path, sheet, cache_key, identitas, data_replace, data_clean):
+    try:
+        data_replace.to_parquet(_artefak_file(cache_key, "replace"), index=False)
+        data_clean.to_parquet(_artefak_file(cache_key, "clean"), index=False)
+        identitas.to_parquet(_artefak_file(cache_key, "identitas"), index=False)
+        with open(_manifest_file(path, sheet), "w") as f:
+            json.dump({"cache_key": cache_key, "columns": list(data_clean.columns)}, f)
+    except Exception as e:
+        print(f"[ingest] Gagal menyimpan artefak preprocessing: {e}")
+
+
+def _kolom_per_indikator(columns):
+    """{indikator: [(tahun, kolom), ...]} untuk kolom TPT_YYYY/TPAK_YYYY, urut tahun."""
+    hasil = {}
+    for col in columns:
+        match = POLA_KOLOM_TAHUN.match(str(col))
+        if match:
+            hasil.setdefault(match.group(1), []).append((int(match.group(2)), col))
+    return {ind: sorted(kolom) for ind, kolom in hasil.items()}
+
+
+def deteksi_tahun_baru(data_lama, data_baru):
+    """
+    Mengembalikan daftar kolom baru jika data_baru hanya menambah tahun di akhir
+    (append-only) dibanding data_lama, atau None jika perubahannya bukan append.
+    """
+    if len(data_lama) != len(data_baru):
+        return None
+    kolom_baru = [c for c in data_baru.columns if c not in data_lama.columns]
+    if not kolom_baru or any(c not in data_baru.columns for c in data_lama.columns):
+        return None
+
+    lama = _kolom_per_indikator(data_lama.columns)
+    for col in kolom_baru:
+        match = POLA_KOLOM_TAHUN.match(str(col))
+        # Hanya tahun baru dari indikator yang sudah ada, setelah tahun terakhir
+        if not match or match.group(1) not in lama or int(match.group(2)) <= lama[match.group(1)][-1][0]:
+            return None
+
+    # Nilai kolom lama tidak boleh berubah
+    if not np.array_equal(
+        data_lama.to_numpy(dtype=float),
+        data_baru[list(data_lama.columns)].to_numpy(dtype=float),
+        equal_nan=True,
+    ):
+        return None
+    return kolom_baru
+
+
+def update_inkremental(data_replace_lama, data_clean_lama, data_replace_baru, kolom_baru):
+    """
+    Memperbarui data_clean untuk kolom tahun baru tanpa memproses ulang semuanya.
+    Hanya baris yang punya missing di ujung (tahun terakhir lama) atau di kolom baru
+    yang diimputasi ulang; baris lain cukup menyalin nilai lama + nilai baru.
+    Mengembalikan (data_clean_baru, kolom yang nilainya berubah).
+    """
+    data_clean = data_replace_baru.copy()
+    data_clean[list(data_clean_lama.columns)] = data_clean_lama.to_numpy()
+    kolom_berubah = list(kolom_baru)
+
+    lama = _kolom_per_indikator(data_replace_lama.columns)
+    baru = _kolom_per_indikator(data_replace_baru.columns)
+    for indikator, kolom_indikator in baru.items():
+        kolom_tambahan = [col for _, col in kolom_indikator if col in kolom_baru]
+        if not kolom_tambahan:
+            continue
+        semua_kolom = [col for _, col in kolom_indikator]
+        kolom_akhir_lama = lama[indikator][-1][1]
+
+        # Baris yang imputasinya bergantung pada tahun baru (tepi kanan)
+        terdampak = (
+            data_replace_lama[kolom_akhir_lama].isna().to_numpy()
+            | data_replace_baru[kolom_tambahan].isna().to_numpy().any(axis=1)
+        )
+        if not terdampak.any():
+            continue
+
+        blok = missing_value(data_replace_baru.loc[terdampak, semua_kolom])
+        sebelum = data_clean.loc[terdampak, semua_kolom].to_numpy()
+        data_clean.loc[terdampak, semua_kolom] = blok.to_numpy()
+
+        berubah = ~np.isclose(sebelum, blok.to_numpy(), equal_nan=True).all(axis=0)
+        kolom_berubah += [col for col, ubah in zip(semua_kolom, berubah) if ubah and col not in kolom_berubah]
+
+    return data_clean, kolom_berubah
+
+
+def ingest_dataset(path, sheet, df_raw=None, dtype=None, logger=None):
+    """
+    Preprocessing dengan artefak cache. Hasil sama dengan preprocessing_data:
+    (datacol_num, data_replace, data_clean, data_norm, data_splits).
+    - Workbook sama: artefak dibaca langsung (tanpa imputasi/normalisasi ulang).
+    - Workbook hanya menambah tahun baru: imputasi di tepi + statistik scaler kolom terdampak.
+    - Perubahan lain: preprocessing penuh.
+    """
+    if df_raw is None:
+        df_raw = muat_data(path, sheet)
+    cache_key = dataset_cache_key(path, sheet)
+    datacol_num = del_col_non_numeric(df_raw)
+
+    artefak = _baca_artefak(cache_key)
+    scaler = muat_scaler_cache(cache_key, datacol_num.columns)
+    if artefak is not None and scaler is not None:
+        data_replace, data_clean = artefak
+        data_norm = data_normalization(data_clean, scaler=scaler, dtype=dtype)
+        return datacol_num, data_replace, data_clean, data_norm, bagi_data(data_norm, scaler=scaler)
+
+    manifest = _baca_manifest(path, sheet)
+    artefak_lama = _baca_artefak(manifest["cache_key"]) if manifest else None
+    scaler_lama = muat_scaler_cache(manifest["cache_key"], manifest["columns"]) if manifest else None
+
+    data_replace = replace_non_numeric(datacol_num)
+    kolom_baru = None
+    if artefak_lama is not None and scaler_lama is not None:
+        kolom_baru = deteksi_tahun_baru(artefak_lama[0], data_replace)
+        try:
+            identitas_lama = pd.read_parquet(_artefak_file(manifest["cache_key"], "identitas"))
+            identitas_baru = df_raw[[c for c in identitas_lama.columns if c in df_raw.columns]]
+            if not identitas_lama.reset_index(drop=True).equals(identitas_baru.reset_index(drop=True)):
+                kolom_baru = None
+        except Exception:
+            kolom_baru = None
+
+    if kolom_baru:
+        if logger:
+            logger.info(f"Kolom tahun baru terdeteksi: {kolom_baru}. Memperbarui artefak secara inkremental.")
+        data_clean, kolom_berubah = update_inkremental(artefak_lama[0], artefak_lama[1], data_replace, kolom_baru)
+        scaler = scaler_lama.update_kolom(data_clean, kolom_berubah)
+        data_norm = data_normalization(data_clean, scaler=scaler, dtype=dtype)
+        data_splits = bagi_data(data_norm, scaler=scaler)
+        simpan_scaler_cache(cache_key, scaler)
+    else:
+        datacol_num, data_replace, data_clean, data_norm, data_splits = preprocessing_data(
+            df_raw, cache_key=cache_key, dtype=dtype
+        )
+
+    identitas = df_raw[[c for c in ('prov', 'kab_kota') if c in df_raw.columns]]
+    _simpan_artefak(path, sheet, cache_key, identitas, data_replace, data_clean)
+    return datacol_num, data_replace, data_clean, data_norm, data_splits
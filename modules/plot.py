@@ -28,7 +28,66 @@ def get_cluster_color_map(cluster_ids):
     color_map[-1] = "#5E5E5E"
     return color_map
 
-def render_metrics_and_silhouette(scores, hasil_data, data_for_clustering):
+# Nama tahap pada scores['tahapan'] untuk rincian waktu (urutan = urutan tampil)
+LABEL_TAHAP = {
+    'muat': "Muat data (Excel)",
+    'preprocessing': "Preprocessing",
+    'split': "Pilih split",
+    'cache': "Ambil dari cache",
+    'pca': "PCA",
+    'sweep': "Sweep parameter",
+    'sensitivitas': "Grid sensitivitas",
+    'fit_akhir': "Fit akhir",
+    'evaluasi': "Evaluasi (Silhouette & DBI)",
+    'tabel': "Tabel hasil",
+    'geo': "Muat GeoJSON",
+    'merge': "Merge peta",
+    'peta': "Buat peta Folium",
+}
+
+
+def tabel_tahapan(tahapan):
+    """DataFrame rincian waktu per tahap (Tahap, Detik, Persen) dari scores['tahapan']."""
+    if not tahapan:
+        return None
+    urutan = [k for k in LABEL_TAHAP if k in tahapan] + [k for k in tahapan if k not in LABEL_TAHAP]
+    detik = [float(tahapan[k]) for k in urutan]
+    total = sum(detik) or 1.0
+    return pd.DataFrame({
+        'Tahap': [LABEL_TAHAP.get(k, k) for k in urutan],
+        'Detik': detik,
+        'Persen': [100 * d / total for d in detik],
+    })
+
+
+def tabel_memori(memori):
+    """DataFrame puncak & sisa alokasi per tahap (MB) dari scores['memori'] (utils/memori.py)."""
+    if not memori:
+        return None
+    urutan = [k for k in LABEL_TAHAP if k in memori] + [k for k in memori if k not in LABEL_TAHAP and k != 'total']
+    if 'total' in memori:
+        urutan.append('total')
+    mb = 1024 ** 2
+    return pd.DataFrame({
+        'Tahap': [LABEL_TAHAP.get(k, "Total run" if k == 'total' else k) for k in urutan],
+        'Puncak (MB)': [memori[k]['puncak'] / mb for k in urutan],
+        'Sisa (MB)': [memori[k]['sisa'] / mb for k in urutan],
+    })
+
+
+def keterangan_ukuran(scores):
+    """Teks ukuran data run: jumlah wilayah x fitur (dan fitur setelah PCA jika berbeda)."""
+    n_baris, n_fitur = scores.get('n_baris'), scores.get('n_fitur')
+    if n_baris is None or n_fitur is None:
+        return None
+    teks = f"{n_baris} wilayah × {n_fitur} fitur"
+    n_fitur_cluster = scores.get('n_fitur_cluster')
+    if n_fitur_cluster is not None and n_fitur_cluster != n_fitur:
+        teks += f" ({n_fitur_cluster} komponen setelah PCA)"
+    return teks
+
+
+def render_metrics_and_silhouette(scores, hasil_data, data_for_clustering, dist=None, sample_values=None):
     """Render metrik evaluasi dan silhouette plot"""
     
     # Jika ada skor, tampilkan metriknya
@@ -51,7 +110,51 @@ def render_metrics_and_silhouette(scores, hasil_data, data_for_clustering):
         
         met_col1.metric("Silhouette", f"{sil_score:.4f}" if sil_score is not None else "N/A", help=help_sil)
         met_col2.metric("DBI", f"{dbi_score:.4f}" if dbi_score is not None else "N/A", help=help_dbi)
-        met_col3.metric("Waktu", f"{time_sec:.2f} s" if time_sec is not None else "N/A", help=help_time)
+        sumber = None
+        if scores.get('atlas'):
+            sumber = "atlas"
+            help_time += " Hasil diambil dari atlas hasil optimal yang sudah dihitung sebelumnya."
+        elif scores.get('cache_hit'):
+            sumber = "cache"
+            help_time += " Hasil diambil dari cache karena konfigurasi yang sama sudah pernah dijalankan."
+        met_col3.metric(
+            "Waktu", f"{time_sec:.2f} s" if time_sec is not None else "N/A", help=help_time,
+            delta=sumber, delta_color="off",
+        )
+
+        df_tahapan = tabel_tahapan(scores.get('tahapan'))
+        if df_tahapan is not None:
+            with st.expander("Rincian waktu per tahap"):
+                ukuran = keterangan_ukuran(scores)
+                if ukuran:
+                    st.caption(ukuran)
+                st.dataframe(
+                    df_tahapan,
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        'Detik': st.column_config.NumberColumn(format="%.3f"),
+                        'Persen': st.column_config.ProgressColumn(format="%.0f%%", min_value=0, max_value=100),
+                    },
+                )
+                st.caption(f"Total: {df_tahapan['Detik'].sum():.2f} s. Metrik Waktu di atas diukur sampai tabel hasil (tanpa peta).")
+
+        df_memori = tabel_memori(scores.get('memori'))
+        if df_memori is not None:
+            with st.expander("Rincian memori per tahap"):
+                st.dataframe(
+                    df_memori,
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        'Puncak (MB)': st.column_config.NumberColumn(format="%.2f"),
+                        'Sisa (MB)': st.column_config.NumberColumn(format="%.2f"),
+                    },
+                )
+                st.caption(
+                    "Diukur dengan tracemalloc. Puncak: alokasi tertinggi selama tahap di atas awal tahap; "
+                    "Sisa: alokasi yang masih ditahan setelah tahap selesai (negatif = dibebaskan)."
+                )
         
     else:
         # Placeholder jika tidak ada skor
@@ -62,7 +165,7 @@ def render_metrics_and_silhouette(scores, hasil_data, data_for_clustering):
     # ============================================================
     
     # Panggil fungsi render_silhouette_plot (Silhouette Plot)
-    render_silhouette_plot(data_for_clustering, hasil_data, scores)
+    render_silhouette_plot(data_for_clustering, hasil_data, scores, dist=dist, sample_values=sample_values)
 
 def create_folium_map(gdf_merged, key_column='WADMKK', tooltip_name_col: str = 'display_name', tooltip_prov_col: str = 'prov'):
     """
@@ -268,8 +371,11 @@ def render_boxplot(df_hasil, data_for_clustering=None):
     except Exception as e:
         st.error(f"Gagal total saat membuat box plot: {e}")
 
-def render_silhouette_plot(data_for_clustering, hasil_data, scores):
-    """Membuat silhouette plot Matplotlib dengan warna konsisten."""
+def render_silhouette_plot(data_for_clustering, hasil_data, scores, dist=None, sample_values=None):
+    """
+    Membuat silhouette plot Matplotlib dengan warna konsisten. dist: DistanceCache dari run (opsional),
+    sample_values: nilai silhouette per wilayah yang sudah dihitung (mis. dari atlas).
+    """
     # Jika data tidak valid, tampilkan info dan keluar
     if data_for_clustering is None or hasil_data is None or scores is None: st.info("Belum menjalankan clustering."); return
     
@@ -307,7 +413,12 @@ def render_silhouette_plot(data_for_clustering, hasil_data, scores):
     
     
     try:
-        sample_silhouette_values = silhouette_samples(data_for_clustering, labels)
+        if sample_values is not None and len(sample_values) == len(labels):
+            sample_silhouette_values = np.asarray(sample_values)
+        elif dist is not None and len(dist) == len(labels):
+            sample_silhouette_values = dist.silhouette_samples(labels)
+        else:
+            sample_silhouette_values = silhouette_samples(data_for_clustering, labels)
         st.caption("Bar yang mengarah ke kiri menunjukkan nilai silhouette negatif, dan lebar/tinggi tiap blok mewakili ukuran cluster sesuai jumlah anggotanya.")
     except Exception as e: 
         st.error(f"Gagal membuat sample silhouette values: {e}"); return
@@ -576,6 +687,67 @@ def render_kmeans_helpers(k_search_data):
         st.error(f"Gagal render tabel K-Optimal: {e}")
         st.dataframe(k_search_data, use_container_width=True)
 
+def render_kmeans_centroids(centroids):
+    """
+    Render tabel centroid K-Means dalam satuan asli (persen), hasil inverse transform scaler.
+    """
+    if centroids is None or centroids.empty:
+        return
+
+    st.subheader("CENTROID CLUSTER (K-MEANS)", help="Titik pusat tiap cluster dalam satuan asli (%), dikembalikan dari data ternormalisasi menggunakan statistik normalisasi (mean & std) dataset.")
+    st.dataframe(centroids.round(2), use_container_width=True)
+
+def render_dbscan_sensitivity(sensitivity_data, eps_terpilih=None, minpts_terpilih=None):
+    """
+    Render heatmap sensitivitas DBSCAN (Epsilon x MinPts) untuk Silhouette, jumlah cluster atau rasio noise.
+    """
+    if sensitivity_data is None or sensitivity_data.empty:
+        return
+
+    st.subheader("SENSITIVITAS EPSILON × MINPTS (DBSCAN)", help="Setiap sel menunjukkan hasil DBSCAN untuk pasangan Epsilon dan MinPts. Area dengan warna yang stabil menandakan konfigurasi yang tidak sensitif terhadap perubahan kecil parameter.")
+    metrik = st.radio(
+        "Metrik",
+        ["Silhouette", "Jumlah Cluster", "Rasio Noise"],
+        key="sensitivity_metric",
+        horizontal=True,
+        label_visibility="collapsed",
+    )
+
+    try:
+        grid = sensitivity_data.pivot(index='MinPts', columns='Epsilon', values=metrik)
+        info = {
+            kolom: sensitivity_data.pivot(index='MinPts', columns='Epsilon', values=kolom).to_numpy()
+            for kolom in ('Silhouette', 'Jumlah Cluster', 'Rasio Noise')
+        }
+        fig = go.Figure(go.Heatmap(
+            z=grid.to_numpy(),
+            x=grid.columns.to_numpy(),
+            y=grid.index.to_numpy(),
+            customdata=np.dstack([info['Silhouette'], info['Jumlah Cluster'], info['Rasio Noise']]),
+            colorscale='Viridis' if metrik == "Silhouette" else 'Blues',
+            colorbar=dict(title=metrik),
+            hovertemplate='Epsilon: %{x:.2f}<br>MinPts: %{y}<br>Silhouette: %{customdata[0]:.4f}'
+                          '<br>Jumlah Cluster: %{customdata[1]}<br>Rasio Noise: %{customdata[2]:.1%}<extra></extra>',
+        ))
+
+        # Tandai parameter yang dipakai pada hasil saat ini
+        if eps_terpilih is not None and minpts_terpilih is not None:
+            fig.add_trace(go.Scatter(
+                x=[eps_terpilih], y=[minpts_terpilih], mode='markers',
+                marker=dict(symbol='x', size=12, color='red'),
+                name='Terpilih', hoverinfo='skip', showlegend=False,
+            ))
+
+        fig.update_layout(
+            xaxis_title="Epsilon",
+            yaxis_title="MinPts",
+            height=450,
+            yaxis=dict(tickmode='linear', dtick=1),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    except Exception as e:
+        st.error(f"Gagal render heatmap sensitivitas: {e}")
+
 def render_dbscan_helpers(elbow_data, elbow_minpts, minpts_plot_data, elbow_knee):
     """
     Render K-distance (Elbow) plot dan Sil vs MinPts plot untuk DBSCAN.
@@ -0,0 +1,162 @@
+"""
+Generator panel TPT/TPAK sintetis beserta layer poligon yang cocok, untuk uji beban dan skala.
+
+Contoh:
+    python -m modules.sintetis --baris 80000 --output sintetis.xlsx --geojson sintetis.geojson
+    python -m modules.sintetis --baris 5000 --tahun 2015 2024 --missing 0.05 --output sintetis.xlsx
+
+Skema sama dengan DATASET.xlsx (prov, kab_kota, TPT_YYYY, TPAK_YYYY, sel kosong berisi '-'),
+sehingga file hasil bisa langsung dipakai preprocessing_data, halaman Clustering maupun
+modules.batch/benchmark. Jika dataset referensi tersedia, nama provinsi, proporsi wilayah
+per provinsi dan rata-rata TPT/TPAK per provinsi diambil dari sana.
+Poligon berupa sel grid di dalam bounding box Indonesia; wilayah satu provinsi membentuk
+blok yang bersebelahan. Kolom nama mengikuti GeoJSON asli (WADMKK, WADMPR).
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Bounding box daratan Indonesia (lon_min, lat_min, lon_max, lat_max)
+BBOX_INDONESIA = (95.0, -11.0, 141.0, 6.0)
+
+# Nilai default jika dataset referensi tidak ada: rata-rata dan sebaran antar wilayah
+TPT_RATA, TPT_SEBARAN = 5.0, 2.0
+TPAK_RATA, TPAK_SEBARAN = 68.0, 5.0
+
+
+def _profil_referensi(path, sheet):
+    """Proporsi wilayah dan rata-rata TPT/TPAK per provinsi dari dataset asli (None jika tidak ada)."""
+    if not path or not os.path.exists(path):
+        return None
+    df = pd.read_excel(path, sheet_name=sheet, dtype={'kab_kota': str})
+    df = df.replace('-', np.nan)
+    kolom_tpt = [c for c in df.columns if str(c).startswith('TPT_')]
+    kolom_tpak = [c for c in df.columns if str(c).startswith('TPAK_')]
+    df['_tpt'] = df[kolom_tpt].apply(pd.to_numeric, errors='coerce').mean(axis=1)
+    df['_tpak'] = df[kolom_tpak].apply(pd.to_numeric, errors='coerce').mean(axis=1)
+    profil = df.groupby('prov', sort=False).agg(n=('kab_kota', 'size'), tpt=('_tpt', 'mean'), tpak=('_tpak', 'mean'))
+    profil['proporsi'] = profil['n'] / profil['n'].sum()
+    return profil.fillna({'tpt': TPT_RATA, 'tpak': TPAK_RATA})
+
+
+def _profil_default(n_prov=38):
+    rng = np.random.default_rng(0)
+    profil = pd.DataFrame({
+        'tpt': rng.normal(TPT_RATA, 1.0, n_prov).clip(2, 10),
+        'tpak': rng.normal(TPAK_RATA, 3.0, n_prov).clip(58, 78),
+    }, index=pd.Index([f"PROVINSI {i + 1:02d}" for i in range(n_prov)], name='prov'))
+    profil['proporsi'] = 1 / n_prov
+    return profil
+
+
+def _nilai_panel(rng, rata_prov, sebaran, tahun, kejutan, batas):
+    """
+    Panel (baris x tahun): level wilayah di sekitar rata-rata provinsinya, tren linear kecil,
+    kejutan tahun 2020-2021 (pandemi) dan noise AR(1) antar tahun.
+    """
+    n, t = len(rata_prov), len(tahun)
+    level = rata_prov + rng.normal(0, sebaran, n)
+    tren = rng.normal(0, sebaran * 0.03, n)[:, None] * (np.asarray(tahun) - tahun[0])[None, :]
+    efek_tahun = np.array([kejutan if th == 2020 else kejutan * 0.5 if th == 2021 else 0.0 for th in tahun])
+    noise = np.empty((n, t))
+    noise[:, 0] = rng.normal(0, sebaran * 0.15, n)
+    for j in range(1, t):
+        noise[:, j] = 0.6 * noise[:, j - 1] + rng.normal(0, sebaran * 0.12, n)
+    return np.clip(level[:, None] + tren + efek_tahun[None, :] + noise, *batas).round(2)
+
+
+def buat_panel(n_baris, tahun=range(2018, 2025), missing=0.02, seed=42,
+               referensi="DATASET.xlsx", sheet_referensi="Populasi"):
+    """
+    DataFrame panel sintetis dengan skema DATASET.xlsx. missing: proporsi sel TPT/TPAK
+    yang diganti '-' (setiap wilayah tetap punya minimal satu nilai per indikator).
+    """
+    rng = np.random.default_rng(seed)
+    tahun = [int(t) for t in tahun]
+    profil = _profil_referensi(referensi, sheet_referensi)
+    if profil is None:
+        profil = _profil_default()
+
+    # Jumlah wilayah per provinsi mengikuti proporsi referensi (metode sisa terbesar)
+    kuota = profil['proporsi'].to_numpy() * n_baris
+    n_per_prov = np.floor(kuota).astype(int)
+    n_per_prov[np.argsort(-(kuota - n_per_prov))[:n_baris - n_per_prov.sum()]] += 1
+
+    kode_prov = np.repeat(np.arange(len(profil)), n_per_prov)
+    prov = profil.index.to_numpy()[kode_prov]
+    urut_dalam_prov = np.concatenate([np.arange(n) for n in n_per_prov]) if len(kode_prov) else np.array([], dtype=int)
+    kab_kota = [f"Wilayah Sintetis {k + 1:02d}-{i + 1:05d}" for k, i in zip(kode_prov, urut_dalam_prov)]
+
+    tpt = _nilai_panel(rng, profil['tpt'].to_numpy()[kode_prov], TPT_SEBARAN, tahun, 1.5, (0.0, 30.0))
+    tpak = _nilai_panel(rng, profil['tpak'].to_numpy()[kode_prov], TPAK_SEBARAN, tahun, -1.0, (35.0, 95.0))
+
+    df = pd.DataFrame({'prov': prov, 'kab_kota': kab_kota})
+    for nama, nilai in (("TPT", tpt), ("TPAK", tpak)):
+        kosong = rng.random(nilai.shape) < missing
+        # Satu tahun acak per wilayah selalu terisi agar imputasi punya nilai acuan
+        kosong[np.arange(len(nilai)), rng.integers(0, len(tahun), len(nilai))] = False
+        kolom = pd.DataFrame(nilai, columns=[f"{nama}_{t}" for t in tahun]).astype(object)
+        df = pd.concat([df, kolom.mask(kosong, '-')], axis=1)
+    return df
+
+
+def buat_poligon(df, bbox=BBOX_INDONESIA):
+    """
+    GeoDataFrame satu poligon (sel grid) per baris df, urut per provinsi sehingga wilayah
+    satu provinsi bersebelahan. Kolom WADMKK/WADMPR berisi kab_kota/prov dari df.
+    """
+    import geopandas as gpd
+    from shapely.geometry import box
+
+    n = len(df)
+    lon_min, lat_min, lon_max, lat_max = bbox
+    lebar, tinggi = lon_max - lon_min, lat_max - lat_min
+    n_kolom = max(1, int(np.ceil(np.sqrt(n * lebar / tinggi))))
+    n_baris = max(1, int(np.ceil(n / n_kolom)))
+    dx, dy = lebar / n_kolom, tinggi / n_baris
+
+    idx = np.arange(n)
+    kiri = lon_min + (idx % n_kolom) * dx
+    atas = lat_max - (idx // n_kolom) * dy
+    geometri = [box(x, y - dy, x + dx, y) for x, y in zip(kiri, atas)]
+    return gpd.GeoDataFrame(
+        {'WADMKK': df['kab_kota'].to_numpy(), 'WADMPR': df['prov'].to_numpy()},
+        geometry=geometri,
+        crs="EPSG:4326",
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Membuat dataset TPT/TPAK sintetis (dan poligon peta) untuk uji skala.")
+    parser.add_argument("--baris", type=int, default=5140, help="Jumlah wilayah (baris), mis. 80000 untuk skala desa")
+    parser.add_argument("--tahun", nargs=2, type=int, default=(2018, 2024), metavar=("AWAL", "AKHIR"), help="Rentang tahun")
+    parser.add_argument("--missing", type=float, default=0.02, help="Proporsi sel yang kosong ('-')")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--referensi", default="DATASET.xlsx", help="Dataset acuan provinsi & rata-rata (kosongkan untuk default)")
+    parser.add_argument("--sheet", default="Populasi", help="Nama sheet output (dan sheet acuan)")
+    parser.add_argument("--output", default="sintetis.xlsx", help="File output (.xlsx, .csv atau .parquet)")
+    parser.add_argument("--geojson", default=None, help="File GeoJSON poligon yang cocok (opsional)")
+    args = parser.parse_args(argv)
+
+    df = buat_panel(
+        args.baris, range(args.tahun[0], args.tahun[1] + 1), missing=args.missing, seed=args.seed,
+        referensi=args.referensi or None, sheet_referensi=args.sheet,
+    )
+    if args.output.lower().endswith(".csv"):
+        df.to_csv(args.output, index=False)
+    elif args.output.lower().endswith(".parquet"):
+        df.astype({c: str for c in df.columns if c not in ('prov', 'kab_kota')}).to_parquet(args.output, index=False)
+    else:
+        df.to_excel(args.output, sheet_name=args.sheet, index=False)
+    print(f"{len(df)} wilayah x {len(df.columns) - 2} kolom -> {args.output}", file=sys.stderr)
+
+    if args.geojson:
+        buat_poligon(df).to_file(args.geojson, driver="GeoJSON")
+        print(f"{len(df)} poligon -> {args.geojson}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
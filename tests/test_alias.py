@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from modules.alias import PencocokNama, simpan_alias, muat_alias, terapkan_alias
+from modules.geo import _normalize_name_series, _make_join_key
+
+
+@pytest.fixture
+def gdf():
+    # Cukup kolom yang diisi siapkan_geojson (tanpa geometri)
+    peta = pd.DataFrame({
+        'orig_name': [
+            "Pangkajene Dan Kepulauan", "Maros", "Kota Makassar",
+            "Pangkajene Kepulauan", "Kota Batu", "Batu Bara", "Jayawijaya",
+        ],
+        'prov': [
+            "SULAWESI SELATAN", "SULAWESI SELATAN", "SULAWESI SELATAN",
+            "JAWA TIMUR", "JAWA TIMUR", "SUMATERA UTARA", "PAPUA",
+        ],
+    })
+    peta['norm_name'] = _normalize_name_series(peta['orig_name'])
+    peta['join_name'] = _make_join_key(peta['norm_name'])
+    peta['prov_g'] = _normalize_name_series(peta['prov'])
+    return peta
+
+
+def test_saran_nama_yang_berubah_dalam_provinsi_sama(gdf):
+    saran = PencocokNama(gdf).sarankan(["Kabupaten Pangkajene Kepulauan", "Makassar"], ["Sulawesi Selatan", "SULAWESI SELATAN"])
+
+    teratas = saran[saran['peringkat'] == 1].set_index('nama_data')
+    # Nama persis di provinsi lain (JAWA TIMUR) tidak ikut disarankan
+    assert teratas.loc["Kabupaten Pangkajene Kepulauan", 'nama_peta'] == "Pangkajene Dan Kepulauan"
+    assert set(saran['prov_peta']) == {"SULAWESI SELATAN"}
+    assert teratas.loc["Makassar", 'nama_peta'] == "Kota Makassar"
+    assert saran['skor'].between(0, 1).all()
+    assert (saran.groupby('nama_data')['skor'].diff().dropna() <= 0).all()
+
+
+def test_provinsi_tidak_ada_di_peta_dicari_di_semua_wilayah(gdf):
+    saran = PencocokNama(gdf).sarankan(["Jayawijaya"], ["Papua Pegunungan"])
+
+    teratas = saran[saran['peringkat'] == 1].iloc[0]
+    assert (teratas['nama_peta'], teratas['prov_peta']) == ("Jayawijaya", "PAPUA")
+    assert teratas['skor'] == pytest.approx(1.0)
+
+
+def test_jenis_wilayah_memisahkan_kota_dan_kabupaten(gdf):
+    # Nama inti sama: kota dan kabupaten dibedakan oleh bobot jenis wilayah
+    kab = pd.DataFrame({'orig_name': ["Batu"], 'prov_g': ["JAWA TIMUR"]})
+    kab['norm_name'] = _normalize_name_series(kab['orig_name'])
+    peta = pd.concat([gdf, kab], ignore_index=True)
+    saran = PencocokNama(peta).sarankan(["Kota Batu", "Kabupaten Batu"], ["Jawa Timur", "Jawa Timur"], top_n=1)
+    assert saran.set_index('nama_data')['nama_peta'].to_dict() == {"Kota Batu": "Kota Batu", "Kabupaten Batu": "Batu"}
+
+
+def test_alias_csv_simpan_lalu_terapkan(tmp_path):
+    path = str(tmp_path / "alias.csv")
+    simpan_alias(pd.DataFrame({'prov': ["Sulawesi Selatan"], 'nama_data': ["Pangkep"], 'nama_peta': ["Pangkajene Dan Kepulauan"]}), path)
+    # Alias baru untuk nama yang sama menggantikan yang lama
+    n = simpan_alias(pd.DataFrame({
+        'prov': ["SULAWESI SELATAN", "PAPUA PEGUNUNGAN"],
+        'nama_data': ["PANGKEP", "Jayawijaya"],
+        'nama_peta': ["Pangkajene Kepulauan", "Jayawijaya"],
+    }), path)
+    assert n == 2
+
+    alias = muat_alias(path)
+    data = pd.DataFrame({'kab_kota': ["Pangkep", "Maros", "Pangkep"], 'prov': ["Sulawesi Selatan", "Sulawesi Selatan", "Jawa Timur"]})
+    join_name = _make_join_key(_normalize_name_series(data['kab_kota']))
+    prov_d = _normalize_name_series(data['prov'])
+
+    hasil = terapkan_alias(join_name, prov_d, alias)
+    # Alias hanya berlaku untuk provinsinya; nama lain tidak berubah
+    assert hasil.tolist() == ["PANGKAJENEKEPULAUAN", "MAROS", "PANGKEP"]
+    assert terapkan_alias(join_name, prov_d, alias.iloc[0:0]).tolist() == join_name.tolist()
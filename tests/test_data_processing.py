@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import utils.cache
+from modules.data_processing import (
+    _muat_sheet, replace_non_numeric, missing_value, preprocessing_data, KOLOM_IDENTITAS,
+)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Populasi"
+    ws.append(["prov", "kab_kota", "TPT_2023", "TPT_2024", "TPAK_2023", "TPAK_2024"])
+    ws.append(["ACEH", "Simeulue", 5.25, "1,5", 63.1, "-"])
+    ws.append(["ACEH", "Aceh Singkil", "4.5", "n/a", None, 70])
+    ws.append(["BALI", "Badung", " 2.75 ", "1_000", "1e1", "teks"])
+    path = tmp_path / "dataset.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+def _muat(path, streaming, cache_dir, monkeypatch):
+    monkeypatch.setattr(utils.cache, "CACHE_DIR", str(cache_dir))
+    return _muat_sheet(path, "Populasi", streaming=streaming)
+
+
+def test_streaming_sama_dengan_read_excel(workbook, tmp_path, monkeypatch):
+    biasa = _muat(workbook, False, tmp_path / "cache_biasa", monkeypatch)
+    streaming = _muat(workbook, True, tmp_path / "cache_streaming", monkeypatch)
+
+    kolom_angka = [c for c in biasa.columns if c not in KOLOM_IDENTITAS]
+    biasa_angka = replace_non_numeric(biasa[kolom_angka]).astype(float)
+    pd.testing.assert_frame_equal(streaming[kolom_angka], biasa_angka, check_dtype=False)
+    assert streaming['kab_kota'].tolist() == biasa['kab_kota'].tolist()
+    # Desimal koma bukan angka di kedua jalur
+    assert np.isnan(streaming.loc[0, 'TPT_2024'])
+
+
+def test_cache_parquet_hanya_decode_kolom_campuran(tmp_path, monkeypatch):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Populasi"
+    ws.append(["prov", "kab_kota", "kode", "TPT_2024"])
+    ws.append(["ACEH", "Simeulue", "0101", 5.25])
+    ws.append(["ACEH", "Aceh Singkil", "A02", "-"])
+    path = str(tmp_path / "kode.xlsx")
+    wb.save(path)
+
+    asli = _muat(path, False, tmp_path / "cache", monkeypatch)
+    dari_cache = _muat(path, False, tmp_path / "cache", monkeypatch)
+
+    # Kode berawalan nol tetap teks, kolom campuran kembali menjadi angka + '-'
+    assert dari_cache['kode'].tolist() == ["0101", "A02"]
+    assert dari_cache['kode'].tolist() == asli['kode'].tolist()
+    assert dari_cache['TPT_2024'].tolist() == [5.25, '-']
+    assert dari_cache['TPT_2024'].tolist() == asli['TPT_2024'].tolist()
+
+
+def _missing_value_interpolate(data):
+    # Implementasi lama (interpolate + bfill + ffill per indikator) sebagai acuan
+    data_clean = data.copy()
+    for indikator in {kolom.split('_')[0] for kolom in data_clean.columns}:
+        kolom_tiap_tahun = sorted(
+            [k for k in data_clean.columns if k.startswith(indikator + '_')], key=lambda x: int(x.split('_')[1])
+        )
+        data_tiap_tahun = data_clean[kolom_tiap_tahun].interpolate(axis=1, method='linear')
+        data_clean[kolom_tiap_tahun] = data_tiap_tahun.bfill(axis=1).ffill(axis=1)
+    return data_clean
+
+
+def test_missing_value_sama_dengan_interpolate():
+    nan = np.nan
+    data = pd.DataFrame({
+        # Kolom sengaja tidak urut tahun
+        'TPT_2019': [nan, 2.0, 3.0, nan, nan],
+        'TPT_2018': [nan, 1.0, nan, 4.0, nan],
+        'TPT_2020': [5.0, nan, nan, nan, nan],
+        'TPT_2021': [6.0, nan, 9.0, 8.0, nan],
+        'TPAK_2018': [60.0, nan, 70.0, 65.0, 61.0],
+        'TPAK_2019': [nan, 62.0, nan, 66.0, nan],
+        'TPAK_2020': [nan, nan, nan, 67.0, nan],
+        'TPAK_2021': [63.0, 64.0, nan, nan, 62.5],
+    })
+
+    hasil, n_imputasi = missing_value(data, return_report=True)
+
+    pd.testing.assert_frame_equal(hasil, _missing_value_interpolate(data))
+    # Baris tanpa nilai valid pada satu indikator tetap NaN dan tidak dihitung sebagai imputasi
+    assert hasil.loc[4, ['TPT_2018', 'TPT_2019', 'TPT_2020', 'TPT_2021']].isna().all()
+    assert n_imputasi.tolist() == (data.isna() & hasil.notna()).sum(axis=1).tolist()
+
+
+def test_dtype_normalisasi_tidak_ikut_scaler_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.cache, "CACHE_DIR", str(tmp_path / "cache"))
+    df = pd.DataFrame({
+        'prov': ["ACEH", "ACEH", "BALI"], 'kab_kota': ["Simeulue", "Aceh Singkil", "Badung"],
+        'TPT_2023': [5.0, 4.5, 2.0], 'TPT_2024': [5.5, "-", 2.5],
+    })
+
+    # Scaler float32 tersimpan di cache tidak menentukan dtype pemanggilan berikutnya
+    assert preprocessing_data(df, cache_key="uji", dtype=np.float32)[3].dtypes.eq(np.float32).all()
+    assert preprocessing_data(df, cache_key="uji")[3].dtypes.eq(np.float64).all()
+    assert preprocessing_data(df, cache_key="uji", dtype=np.float32)[3].dtypes.eq(np.float32).all()
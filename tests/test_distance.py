@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import silhouette_score
+from sklearn.neighbors import NearestNeighbors
+
+from modules.data_processing import dbscan_clustering
+from modules.distance import DistanceCache, DBSCANExtractor
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    pusat = np.array([[0.0, 0.0, 0.0], [3.0, 3.0, 0.0], [0.0, 4.0, 2.0]])
+    titik = np.vstack([p + rng.normal(0, 0.6, (40, 3)) for p in pusat] + [rng.uniform(-3, 6, (15, 3))])
+    return titik[rng.permutation(len(titik))]
+
+
+@pytest.mark.parametrize("eps, min_samples", [(0.5, 3), (0.8, 4), (1.2, 5), (1.6, 8), (3.0, 20)])
+def test_extractor_sama_dengan_sklearn(data, eps, min_samples):
+    extractor = DBSCANExtractor(DistanceCache(data), min_samples, eps_max=3.0)
+    hasil = extractor.extract(eps)
+
+    acuan = DBSCAN(eps=eps, min_samples=min_samples, metric='manhattan').fit(data)
+    np.testing.assert_array_equal(hasil['labels'], acuan.labels_)
+    assert hasil['point_type'] == dbscan_clustering(data, eps, min_samples)['point_type']
+
+
+def test_border_di_antara_dua_cluster_ikut_label_terkecil():
+    # Titik 4.0 hanya punya 3 tetangga (bukan core) tetapi terjangkau core kedua cluster
+    x = np.array([6.0, 6.5, 7.0, 7.5, 8.0, 4.0, 0.0, 0.5, 1.0, 1.5, 2.0])[:, None]
+    hasil = DBSCANExtractor(DistanceCache(x), 4, eps_max=2.0).extract(2.0)
+
+    acuan = DBSCAN(eps=2.0, min_samples=4, metric='manhattan').fit(x)
+    np.testing.assert_array_equal(hasil['labels'], acuan.labels_)
+    assert hasil['point_type'][5] == "Border"
+    assert hasil['labels'][5] == 0
+
+
+def test_distance_cache_per_blok_di_atas_batas(data):
+    # Batas memori lebih kecil dari matriks N x N: jarak dihitung per blok tanpa matriks
+    dist = DistanceCache(data, max_bytes=len(data) ** 2 * 4 - 1)
+    penuh = DistanceCache(data)
+    assert not dist.muat_matriks and penuh.muat_matriks
+    assert dist.matrix('manhattan') is None
+
+    acuan = NearestNeighbors(n_neighbors=6, metric='manhattan').fit(data).kneighbors(data)[0]
+    np.testing.assert_allclose(dist.kneighbors(6), acuan)
+    np.testing.assert_allclose(penuh.kneighbors(6), acuan, rtol=1e-6)
+
+    labels = dist.dbscan(1.2, 5)['labels']
+    np.testing.assert_array_equal(labels, penuh.dbscan(1.2, 5)['labels'])
+    valid = labels != -1
+    assert dist.silhouette_score(labels[valid], mask=valid) == pytest.approx(silhouette_score(data[valid], labels[valid]))
+
+    hasil = DBSCANExtractor(dist, 5, eps_max=2.0).extract(1.2)
+    np.testing.assert_array_equal(hasil['labels'], labels)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+import utils.cache
+from modules.data_processing import preprocessing_data
+from modules.ingest import ingest_dataset
+
+
+class _Log:
+    def __init__(self):
+        self.pesan = []
+
+    def info(self, teks):
+        self.pesan.append(teks)
+
+
+def _dataset(tahun):
+    nan = np.nan
+    nilai = {
+        'TPT_2021': [5.0, nan, 3.0, 4.0],
+        'TPT_2022': [5.5, 2.0, nan, 4.5],
+        'TPT_2023': [nan, 2.5, 3.5, 4.2],
+        'TPT_2024': [6.0, nan, 3.1, nan],
+        'TPAK_2021': [60.0, 61.0, nan, 65.0],
+        'TPAK_2022': [62.0, nan, 70.0, 66.0],
+        'TPAK_2023': [63.0, 64.0, 71.0, nan],
+        'TPAK_2024': [nan, 64.5, 72.0, 67.0],
+    }
+    df = pd.DataFrame({
+        'prov': ["ACEH", "ACEH", "BALI", "BALI"],
+        'kab_kota': ["Simeulue", "Aceh Singkil", "Badung", "Gianyar"],
+    })
+    for kolom, isi in nilai.items():
+        if int(kolom.split('_')[1]) in tahun:
+            df[kolom] = pd.Series(isi, dtype=object).where(pd.notna(isi), '-')
+    return df
+
+
+def test_update_inkremental_sama_dengan_preprocessing_penuh(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.cache, "CACHE_DIR", str(tmp_path / "cache"))
+    path = str(tmp_path / "dataset.xlsx")
+
+    lama = _dataset(range(2021, 2024))
+    lama.to_excel(path, sheet_name="Populasi", index=False)
+    ingest_dataset(path, "Populasi", df_raw=lama)
+
+    # Rilis baru: workbook yang sama ditambah kolom tahun 2024
+    baru = _dataset(range(2021, 2025))
+    baru.to_excel(path, sheet_name="Populasi", index=False)
+    log = _Log()
+    _, data_replace, data_clean, _, data_splits = ingest_dataset(path, "Populasi", df_raw=baru, logger=log)
+    assert any("Kolom tahun baru" in p for p in log.pesan)
+
+    _, replace_penuh, clean_penuh, _, splits_penuh = preprocessing_data(baru)
+    pd.testing.assert_frame_equal(data_replace, replace_penuh)
+    pd.testing.assert_frame_equal(data_clean, clean_penuh)
+
+    scaler, scaler_penuh = data_splits.scaler, splits_penuh.scaler
+    posisi = [scaler.columns.index(c) for c in scaler_penuh.columns]
+    np.testing.assert_allclose(scaler.mean_[posisi], scaler_penuh.mean_)
+    np.testing.assert_allclose(scaler.std_[posisi], scaler_penuh.std_)
+
+    assert list(data_splits) == list(splits_penuh)
+    for nama in splits_penuh:
+        pd.testing.assert_frame_equal(data_splits[nama], splits_penuh[nama])
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+# Folder cache lokal (tidak ikut di-commit, lihat .gitignore)
+CACHE_DIR = ".cache"
+
+# Memo hash per (path, mtime, size) agar file yang sama tidak di-hash ulang tiap rerun
+_hash_memo = {}
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Menghitung hash SHA-256 dari isi file (dibaca per blok)."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if memo_key in _hash_memo:
+        return _hash_memo[memo_key]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for blok in iter(lambda: f.read(chunk_size), b""):
+            h.update(blok)
+    _hash_memo[memo_key] = h.hexdigest()
+    return _hash_memo[memo_key]
+
+
+def cache_path(*parts):
+    """Membuat path di dalam CACHE_DIR dan memastikan foldernya ada."""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def safe_name(text):
+    """Mengubah teks bebas (nama sheet, path) menjadi nama file yang aman."""
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in str(text))
+
+
+class LRUCache:
+    """
+    Cache LRU proses-wide (dipakai bersama semua sesi Streamlit) dengan batas ukuran
+    dalam byte (ukuran pickle nilai) dan tier disk opsional yang juga dibatasi ukurannya.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 ** 2, disk_dir=None, disk_max_bytes=256 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._data = OrderedDict()
+        self._ukuran = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _disk_file(self, key):
+        return os.path.join(self.disk_dir, f"{safe_name(key)}.pkl")
+
+    def _simpan_memori(self, key, value, ukuran):
+        if ukuran > self.max_bytes:
+            return
+        if key in self._data:
+            self._total -= self._ukuran.pop(key)
+            del self._data[key]
+        self._data[key] = value
+        self._ukuran[key] = ukuran
+        self._total += ukuran
+        while self._total > self.max_bytes:
+            lama, _ = self._data.popitem(last=False)
+            self._total -= self._ukuran.pop(lama)
+
+    def get(self, key):
+        """Nilai untuk key (memori dulu, lalu disk), atau None jika tidak ada."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_file(key), "rb") as f:
+                isi = f.read()
+            os.utime(self._disk_file(key))
+            value = pickle.loads(isi)
+        except Exception:
+            return None
+        with self._lock:
+            self._simpan_memori(key, value, len(isi))
+        return value
+
+    def put(self, key, value):
+        isi = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._simpan_memori(key, value, len(isi))
+        if self.disk_dir and len(isi) <= self.disk_max_bytes:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                tmp = self._disk_file(key) + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(isi)
+                os.replace(tmp, self._disk_file(key))
+                self._pangkas_disk()
+            except Exception as e:
+                print(f"[cache] Gagal menyimpan cache ke disk: {e}")
+
+    def _pangkas_disk(self):
+        """Menghapus file paling lama dipakai sampai total ukuran di bawah disk_max_bytes."""
+        files = []
+        for nama in os.listdir(self.disk_dir):
+            if nama.endswith(".pkl"):
+                stat = os.stat(os.path.join(self.disk_dir, nama))
+                files.append((stat.st_mtime, stat.st_size, nama))
+        total = sum(size for _, size, _ in files)
+        for _, size, nama in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            os.remove(os.path.join(self.disk_dir, nama))
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._ukuran.clear()
+            self._total = 0
@@ -0,0 +1,210 @@
+import os
+import sys
+import types
+import weakref
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+import pandas as pd
+
+# Pengukuran memori juga bisa dinyalakan untuk semua run lewat environment variable, mis. CLUSTERING_MEMORY=1
+MEMORI_ENV = "CLUSTERING_MEMORY"
+# Menu Admin (ukuran session_state semua sesi aktif) hanya muncul jika CLUSTERING_ADMIN=1
+ADMIN_ENV = "CLUSTERING_ADMIN"
+
+# Pelacak aktif untuk thread/sesi ini; catat_waktu di engine mencatat memori tahap ke sini
+_pelacak_aktif = ContextVar("pelacak_memori", default=None)
+
+# tracemalloc bersifat global per proses: dinyalakan saat pengguna pertama masuk, dimatikan saat terakhir keluar
+_kunci = threading.Lock()
+_jumlah_pengguna = 0
+
+# Session state per session_id, weakref agar sesi yang sudah ditutup hilang sendiri
+_sesi_aktif = weakref.WeakValueDictionary()
+
+
+def _env_aktif(nama):
+    return os.environ.get(nama, "").strip().lower() in ("1", "true", "yes", "ya", "on")
+
+
+def memori_dari_env():
+    return _env_aktif(MEMORI_ENV)
+
+
+def admin_dari_env():
+    return _env_aktif(ADMIN_ENV)
+
+
+class PelacakMemori:
+    """
+    Puncak dan sisa alokasi (byte, tracemalloc) per tahap. Tahap bersarang menaikkan
+    puncak tahap induknya; tahap yang dipanggil berulang: puncak diambil maksimum, sisa dijumlahkan.
+    """
+
+    def __init__(self):
+        self.tahapan = {}
+        self._tumpukan = []
+
+    def _masuk(self):
+        sekarang, puncak = tracemalloc.get_traced_memory()
+        if self._tumpukan:
+            self._tumpukan[-1][1] = max(self._tumpukan[-1][1], puncak)
+        self._tumpukan.append([sekarang, sekarang])
+        tracemalloc.reset_peak()
+
+    def _keluar(self):
+        sekarang, puncak = tracemalloc.get_traced_memory()
+        awal, puncak_sebelum = self._tumpukan.pop()
+        puncak = max(puncak, puncak_sebelum)
+        if self._tumpukan:
+            self._tumpukan[-1][1] = max(self._tumpukan[-1][1], puncak)
+        tracemalloc.reset_peak()
+        return puncak - awal, sekarang - awal
+
+    @contextmanager
+    def tahap(self, nama):
+        self._masuk()
+        try:
+            yield
+        finally:
+            puncak, sisa = self._keluar()
+            lama = self.tahapan.get(nama)
+            if lama is None:
+                self.tahapan[nama] = {'puncak': puncak, 'sisa': sisa}
+            else:
+                lama['puncak'] = max(lama['puncak'], puncak)
+                lama['sisa'] += sisa
+
+
+@contextmanager
+def ukur_memori(aktif):
+    """
+    Menjalankan blok dengan tracemalloc dan menghasilkan PelacakMemori (None jika nonaktif).
+    Total seluruh blok tersimpan di pelacak.tahapan['total']. tracemalloc memperlambat
+    alokasi (kira-kira 2x) dan mencatat alokasi semua thread, jadi angka bisa ikut
+    memuat kerja sesi lain yang berjalan bersamaan.
+    """
+    global _jumlah_pengguna
+    if not aktif:
+        yield None
+        return
+    with _kunci:
+        if _jumlah_pengguna == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _jumlah_pengguna += 1
+    pelacak = PelacakMemori()
+    token = _pelacak_aktif.set(pelacak)
+    try:
+        with pelacak.tahap('total'):
+            yield pelacak
+    finally:
+        _pelacak_aktif.reset(token)
+        with _kunci:
+            _jumlah_pengguna -= 1
+            if _jumlah_pengguna == 0:
+                tracemalloc.stop()
+
+
+@contextmanager
+def catat_memori(tahap):
+    """Mencatat memori tahap ke pelacak aktif; tanpa pelacak aktif tidak melakukan apa pun."""
+    pelacak = _pelacak_aktif.get()
+    if pelacak is None:
+        yield
+        return
+    with pelacak.tahap(tahap):
+        yield
+
+
+def _ukuran_geometri(gdf):
+    # Geometri shapely tidak terhitung oleh memory_usage; perkiraan 16 byte per koordinat + overhead objek
+    try:
+        import shapely
+        geom = gdf.geometry.array
+        return int(shapely.get_num_coordinates(geom).sum()) * 16 + len(geom) * 64
+    except Exception:
+        return 0
+
+
+# Objek bersama tingkat modul (template, modul, fungsi) tidak dihitung sebagai milik sesi
+_DILEWATI = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, threading.Lock().__class__)
+_MODUL_DILEWATI = ("jinja2", "logging", "threading", "streamlit")
+
+
+def ukuran_objek(obj, _dilihat=None):
+    """
+    Perkiraan byte yang ditahan obj, rekursif ke isi container dan atribut objek.
+    Objek yang sama hanya dihitung sekali per pemanggilan (pakai _dilihat yang sama untuk beberapa objek).
+    """
+    dilihat = set() if _dilihat is None else _dilihat
+    if obj is None or id(obj) in dilihat or isinstance(obj, _DILEWATI):
+        return 0
+    if type(obj).__module__.split(".")[0] in _MODUL_DILEWATI:
+        return 0
+    dilihat.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        ukuran = int(obj.memory_usage(deep=True).sum())
+        return ukuran + (_ukuran_geometri(obj) if hasattr(obj, "geometry") else 0)
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        # View berbagi buffer dengan array asalnya, yang dihitung sekali
+        if isinstance(obj.base, np.ndarray):
+            return ukuran_objek(obj.base, dilihat)
+        return obj.nbytes
+    if isinstance(obj, (str, bytes, bytearray, int, float, complex, bool)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(ukuran_objek(k, dilihat) + ukuran_objek(v, dilihat) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(ukuran_objek(v, dilihat) for v in obj)
+
+    ukuran = sys.getsizeof(obj)
+    atribut = getattr(obj, "__dict__", None)
+    if isinstance(atribut, dict):
+        ukuran += ukuran_objek(atribut, dilihat)
+    for slot in getattr(type(obj), "__slots__", ()):
+        ukuran += ukuran_objek(getattr(obj, slot, None), dilihat)
+    return ukuran
+
+
+def daftarkan_sesi():
+    """Mendaftarkan session_state sesi Streamlit yang sedang berjalan (dipanggil tiap rerun dari app.py)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        _sesi_aktif[ctx.session_id] = ctx.session_state
+
+
+def ukuran_sesi():
+    """
+    (tabel, total_unik): byte per key session_state per sesi aktif, urut dari terbesar, dan
+    total tanpa hitung ganda objek yang dipakai bersama antar key/sesi (mis. atlas, cache proses).
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    sesi_ini = ctx.session_id if ctx is not None else None
+    baris = []
+    dilihat_global = set()
+    total_unik = 0
+    for session_id, state in list(_sesi_aktif.items()):
+        try:
+            isi = state.filtered_state
+        except Exception:
+            continue
+        for key, nilai in isi.items():
+            baris.append({
+                'Sesi': session_id[:8] + (" (ini)" if session_id == sesi_ini else ""),
+                'Key': key,
+                'Tipe': type(nilai).__name__,
+                'Byte': ukuran_objek(nilai),
+            })
+            total_unik += ukuran_objek(nilai, dilihat_global)
+    tabel = pd.DataFrame(baris, columns=['Sesi', 'Key', 'Tipe', 'Byte'])
+    return tabel.sort_values('Byte', ascending=False).reset_index(drop=True), total_unik
@@ -0,0 +1,130 @@
+import os
+import time
+import threading
+import marshal
+import cProfile
+import pstats
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Profiling juga bisa dinyalakan untuk semua run lewat environment variable, mis. CLUSTERING_PROFILE=1
+PROFIL_ENV = "CLUSTERING_PROFILE"
+
+
+def profil_dari_env():
+    return os.environ.get(PROFIL_ENV, "").strip().lower() in ("1", "true", "yes", "ya", "on")
+
+
+# threading.setprofile berlaku untuk seluruh proses: hanya satu profil yang ikut merekam thread baru
+_kunci_thread = threading.Lock()
+
+
+class ProfilGabungan(cProfile.Profile):
+    """cProfile.Profile thread pemanggil yang statistiknya digabung dengan profil thread worker."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats_thread = []
+
+    def create_stats(self):
+        super().create_stats()
+        for stats in self.stats_thread:
+            for func, nilai in stats.items():
+                if func in self.stats:
+                    self.stats[func] = pstats.add_func_stats(self.stats[func], nilai)
+                else:
+                    self.stats[func] = nilai[:4] + (dict(nilai[4]),)
+
+
+@contextmanager
+def profil(aktif):
+    """
+    Menjalankan blok di bawah cProfile jika aktif dan menghasilkan objek Profile-nya.
+    Saat nonaktif hanya menghasilkan None (tanpa hook profiler, tanpa overhead).
+    Thread yang dimulai selama blok (thread pool preload sheet, sweep K) diprofil lewat
+    threading.setprofile dan digabung ke hasil. Thread sesi lain yang dimulai bersamaan
+    bisa ikut terekam; jika profil lain sedang merekam thread, hanya thread pemanggil yang diprofil.
+    """
+    if not aktif:
+        yield None
+        return
+    profiler = ProfilGabungan()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Profiler lain sedang aktif (mis. sesi lain), blok tetap dijalankan tanpa profiling
+        yield None
+        return
+
+    profil_thread = []
+
+    def _mulai_di_thread(frame, event, arg):
+        # Dipanggil sekali di awal thread baru; enable() mengganti hook ini dengan cProfile
+        thread_profiler = cProfile.Profile()
+        thread_profiler.enable()
+        profil_thread.append(thread_profiler)
+
+    rekam_thread = _kunci_thread.acquire(blocking=False)
+    if rekam_thread:
+        threading.setprofile(_mulai_di_thread)
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if rekam_thread:
+            threading.setprofile(None)
+            _kunci_thread.release()
+        for thread_profiler in profil_thread:
+            try:
+                thread_profiler.create_stats()
+                profiler.stats_thread.append(thread_profiler.stats)
+            except Exception:
+                # Thread yang masih berjalan tidak ikut digabung
+                continue
+
+
+def fungsi_terberat(profiler, top_n=15, urut='cumulative'):
+    """Tabel top-N fungsi dari hasil profil, diurutkan berdasarkan waktu kumulatif (atau 'tottime')."""
+    stats = pstats.Stats(profiler)
+    baris = []
+    for (file, line, nama), (cc, nc, tt, ct, _) in stats.stats.items():
+        lokasi = "~" if file == "~" else f"{os.path.basename(file)}:{line}"
+        baris.append({
+            'Fungsi': nama if file == "~" else f"{nama} ({lokasi})",
+            'Panggilan': nc,
+            'Waktu sendiri (s)': tt,
+            'Waktu kumulatif (s)': ct,
+        })
+    kolom = 'Waktu kumulatif (s)' if urut == 'cumulative' else 'Waktu sendiri (s)'
+    df = pd.DataFrame(baris, columns=['Fungsi', 'Panggilan', 'Waktu sendiri (s)', 'Waktu kumulatif (s)'])
+    return df.sort_values(kolom, ascending=False).head(top_n).reset_index(drop=True)
+
+
+def profil_ke_bytes(profiler):
+    """Isi file .prof (format pstats), bisa dibuka dengan pstats.Stats(file) atau snakeviz."""
+    return marshal.dumps(pstats.Stats(profiler).stats)
+
+
+def simpan_profil(session_state, nama, profiler, top_n=15):
+    """Menyimpan profil terakhir (file & ringkasan top-N) ke session_state['profil_terakhir']."""
+    hasil = {
+        'nama': nama,
+        'file_name': f"profil_{nama}_{time.strftime('%Y%m%d_%H%M%S')}.prof",
+        'data': profil_ke_bytes(profiler),
+        'ringkasan': fungsi_terberat(profiler, top_n=top_n),
+        'total': pstats.Stats(profiler).total_tt,
+    }
+    session_state['profil_terakhir'] = hasil
+    return hasil
+
+
+def tampilkan_ringkasan(container, hasil):
+    """Menampilkan ringkasan profil (tabel fungsi terberat) di container Streamlit (mis. status log sidebar)."""
+    # Total menjumlahkan waktu semua thread yang diprofil, bisa lebih besar dari waktu dinding
+    container.markdown(f"**Profil `{hasil['nama']}`** — total {hasil['total']:.2f} s (semua thread)")
+    container.dataframe(
+        hasil['ringkasan'].round({'Waktu sendiri (s)': 4, 'Waktu kumulatif (s)': 4}),
+        hide_index=True,
+        use_container_width=True,
+    )
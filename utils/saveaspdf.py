@@ -7,7 +7,7 @@ import numpy as np
 from sklearn.metrics import silhouette_samples
 from matplotlib.patches import Rectangle
 
-from modules.plot import get_cluster_color_map
+from modules.plot import get_cluster_color_map, tabel_tahapan, keterangan_ukuran
 
 
 
@@ -126,8 +126,8 @@ def render_static_map_to_buffer(gdf_hasil):
         return None
 
 
-def render_silhouette_to_buffer(hasil_data, data_for_clustering):
-    """Render silhouette plot"""
+def render_silhouette_to_buffer(hasil_data, data_for_clustering, dist=None, sample_values=None):
+    """Render silhouette plot (memakai nilai silhouette atlas atau DistanceCache run jika ada)"""
     try:
         if data_for_clustering is None or hasil_data is None or 'Cluster' not in hasil_data.columns:
             return None
@@ -141,7 +141,12 @@ def render_silhouette_to_buffer(hasil_data, data_for_clustering):
             return None
             
         # Hitung silhouette samples
-        silhouette_vals = silhouette_samples(data_for_clustering, labels)
+        if sample_values is not None and len(sample_values) == len(labels):
+            silhouette_vals = np.asarray(sample_values)
+        elif dist is not None and len(dist) == len(labels):
+            silhouette_vals = dist.silhouette_samples(labels)
+        else:
+            silhouette_vals = silhouette_samples(data_for_clustering, labels)
         avg_score = silhouette_vals.mean()
         
         fig, ax = plt.subplots(figsize=(10, 7))
@@ -356,6 +361,7 @@ def generate_pdf_report():
     pdf.add_page()
     pdf.chapter_title("1. Parameter Analisis")
     input_text = (
+        f"Sheet Dataset: {st.session_state.get('sheet_pilihan', 'Populasi')}\n"
         f"Variabel yang Digunakan: {var}\n"
         f"Rentang Tahun Analisis: {tahun_pilihan[0]} - {tahun_pilihan[1]}\n"
         f"Metode Clustering: {metode}\n"
@@ -388,13 +394,33 @@ def generate_pdf_report():
             f"Jumlah Cluster Terbentuk: {hasil_data['Cluster'].nunique()}"
         )
         pdf.chapter_body(metric_text)
+
+        df_tahapan = tabel_tahapan(scores.get("tahapan"))
+        if df_tahapan is not None:
+            pdf.set_font('Arial', 'B', 11)
+            ukuran = keterangan_ukuran(scores)
+            judul = "Rincian Waktu per Tahap" + (f" ({ukuran})" if ukuran else "")
+            pdf.cell(0, 8, judul.replace("×", "x"), 0, 1, 'L')
+            df_tahapan = df_tahapan.assign(
+                Detik=df_tahapan['Detik'].map(lambda d: f"{d:.3f}"),
+                Persen=df_tahapan['Persen'].map(lambda p: f"{p:.1f}%"),
+            )
+            pdf.add_dataframe_to_pdf(df_tahapan, cols_to_show=None)
     else:
         pdf.chapter_body("(Skor metrik tidak tersedia)")
 
+    centroids = st.session_state.get("kmeans_centroids")
+    if metode == "K-Means" and centroids is not None and not centroids.empty:
+        pdf.set_font('Arial', 'B', 11)
+        pdf.cell(0, 8, "Centroid Cluster (satuan asli, %)", 0, 1, 'L')
+        pdf.add_dataframe_to_pdf(centroids.round(2).reset_index(), cols_to_show=None)
+
     # === HALAMAN 2: SILHOUETTE PLOT (Full Page) ===
     pdf.add_page()
     pdf.chapter_title("3. Silhouette Plot")
-    sil_buf = render_silhouette_to_buffer(hasil_data, data_for_clustering)
+    sil_buf = render_silhouette_to_buffer(
+        hasil_data, data_for_clustering, st.session_state.get("distance_cache"), st.session_state.get("silhouette_samples")
+    )
     if sil_buf:
         # Full page silhouette plot
         pdf.image(sil_buf, x=50, y=pdf.get_y(), w=200)
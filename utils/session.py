@@ -1,13 +1,23 @@
 import streamlit as st
+from modules.data_processing import muat_data, daftar_tahun
 
-# Inisialisasi daftar tahun
-opsi_tahun = [str(y) for y in range(2018, 2025)]
+DEFAULT_PATH = "DATASET.xlsx"
+DEFAULT_SHEET = "Populasi"
+
+# Daftar tahun diambil dari kolom TPT_YYYY/TPAK_YYYY pada dataset
+def get_opsi_tahun(path=DEFAULT_PATH, sheet=DEFAULT_SHEET):
+    return [str(y) for y in daftar_tahun(muat_data(path, sheet))]
 
 def get_var():
     return st.session_state.get('var', '')
 
 def get_tahun():
-    return st.session_state.get('tahun_pilihan', (opsi_tahun[0], opsi_tahun[-1]))
+    # Dataset hanya dibaca jika tahun belum dipilih; rentang default dari sheet yang sedang dipilih
+    tahun = st.session_state.get('tahun_pilihan')
+    if tahun is not None:
+        return tahun
+    opsi_tahun = get_opsi_tahun(DEFAULT_PATH, st.session_state.get('sheet_pilihan', DEFAULT_SHEET))
+    return (opsi_tahun[0], opsi_tahun[-1])
 
 def get_params():
     return st.session_state.get('params', {})
@@ -28,7 +38,8 @@ def reset_clustering_state():
         'metode_pilihan', 'params', 'hasil_data', 'scores', 
         'gdf_hasil', 'data_for_clustering', 'map_object', 
         'cluster_color_map', 'dbscan_elbow_data', 'dbscan_elbow_minpts', 
-        'dbscan_minpts_plot_data', 'dbscan_elbow_knee', 'kmeans_k_search_data' # <-- TAMBAHKAN INI
+        'dbscan_minpts_plot_data', 'dbscan_elbow_knee', 'dbscan_sensitivity_data', 'kmeans_k_search_data', # <-- TAMBAHKAN INI
+        'kmeans_centroids', 'distance_cache', 'dbscan_live', 'silhouette_samples'
     ]:
         if key in st.session_state:
             st.session_state[key] = None